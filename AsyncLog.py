@@ -0,0 +1,133 @@
+# Background writer thread that keeps log I/O off the frame loop
+import collections
+import threading
+import time
+import numpy as np
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "coalesce")
+
+class AsyncLog:
+    """Wraps a TextLog or SnapshotWriter and writes its frames on a background thread.
+
+    append() copies the state columns into a bounded queue and returns; the
+    writer thread formats, writes and flushes. When the queue is full the
+    policy decides what happens:
+
+    - "block": wait for the writer to make room
+    - "drop_oldest": discard the oldest queued frame
+    - "coalesce": replace the newest queued frame with the new one
+    """
+
+    def __init__(self, log, max_queue=8, policy="block"):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy {policy!r}, expected one of {BACKPRESSURE_POLICIES}")
+        self.log = log
+        self.max_queue = max(1, max_queue)
+        self.policy = policy
+
+        self.queue = collections.deque()
+        self.condition = threading.Condition()
+        self.closing = False
+        self.error = None
+
+        # Counters
+        self.enqueued_frames = 0
+        self.written_frames = 0
+        self.dropped_frames = 0
+        self.coalesced_frames = 0
+        self.max_queue_depth = 0
+        self.writer_lag = 0.0
+        self.max_writer_lag = 0.0
+
+        self.thread = threading.Thread(target=self._run, name="AsyncLog", daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    @property
+    def queue_depth(self):
+        return len(self.queue)
+
+    def stats(self):
+        """Return a snapshot of the queue and writer counters."""
+        with self.condition:
+            return {
+                "queue_depth": len(self.queue),
+                "max_queue_depth": self.max_queue_depth,
+                "enqueued_frames": self.enqueued_frames,
+                "written_frames": self.written_frames,
+                "dropped_frames": self.dropped_frames,
+                "coalesced_frames": self.coalesced_frames,
+                "writer_lag": self.writer_lag,
+                "max_writer_lag": self.max_writer_lag,
+            }
+
+    def append(self, frame, x, y, vx, vy, color):
+        """Queue a copy of one frame of state for the writer thread."""
+        item = (time.perf_counter(), frame, [np.array(column) for column in (x, y, vx, vy, color)])
+        with self.condition:
+            self._raise_writer_error()
+            if len(self.queue) >= self.max_queue:
+                if self.policy == "block":
+                    while len(self.queue) >= self.max_queue and self.error is None:
+                        self.condition.wait()
+                    self._raise_writer_error()
+                elif self.policy == "drop_oldest":
+                    self.queue.popleft()
+                    self.dropped_frames += 1
+                else:
+                    self.queue.pop()
+                    self.coalesced_frames += 1
+            self.queue.append(item)
+            self.enqueued_frames += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self.queue))
+            self.condition.notify_all()
+
+    def flush(self):
+        """No-op for the caller; the writer thread flushes after draining the queue."""
+
+    def close(self, total_frames=None):
+        """Write every queued frame, stop the writer thread and close the wrapped log."""
+        with self.condition:
+            if self.closing:
+                return
+            self.closing = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.log.close(total_frames=total_frames)
+        self._raise_writer_error()
+
+    def _raise_writer_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("Background log writer failed") from error
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queue and not self.closing:
+                    self.condition.wait()
+                if not self.queue:
+                    return
+                enqueued_at, frame, columns = self.queue.popleft()
+                self.condition.notify_all()
+
+            try:
+                self.log.append(frame, *columns)
+                if not self.queue:
+                    self.log.flush()
+            except Exception as error:
+                with self.condition:
+                    self.error = error
+                    self.queue.clear()
+                    self.condition.notify_all()
+                return
+
+            with self.condition:
+                self.written_frames += 1
+                self.writer_lag = time.perf_counter() - enqueued_at
+                self.max_writer_lag = max(self.max_writer_lag, self.writer_lag)
@@ -1,41 +1,223 @@
 # Blob class for position, color, and velocity
 import random
 import math
+import itertools
 from Config import config
+from CollisionMemory import CollisionMemory
+
+class Arena:
+    """World settings shared by every blob of a population.
+
+    settings is the run's RunConfig (a fresh config snapshot by default); blobs
+    read every tunable from it rather than from the global config.
+
+    A population decays its collision memory once per frame itself. With
+    decay_on_move, Blob.move does it instead, the way blobs used to fade
+    their own memory: each pair fades when the lower-indexed of its two
+    blobs moves, so once per frame when every blob moves once.
+    """
+    
+    __slots__ = ("width", "height", "collision_memory", "settings", "decay_on_move")
+    
+    # Arenas of blobs created without one, per (width, height, collision_memory, settings)
+    _standalone = {}
+    
+    def __init__(self, width, height, collision_memory=None, settings=None, decay_on_move=False):
+        self.width = width
+        self.height = height
+        self.settings = config.snapshot() if settings is None else settings
+        # The memory store also owns the decay rate
+        self.collision_memory = (CollisionMemory(decay=self.settings.COLLISION_MEMORY_DECAY)
+                                 if collision_memory is None else collision_memory)
+        self.decay_on_move = decay_on_move
+    
+    @classmethod
+    def standalone(cls, width, height, collision_memory=None, settings=None):
+        """Return the Arena shared by every blob created on its own with these arguments.
+
+        It is built (with a config snapshot, unless settings are given) the
+        first time it is asked for and decays on move. The cache is
+        process-wide: unrelated groups of standalone blobs of the same size
+        share one collision memory and keep the settings of the first
+        snapshot. Give a group its own Arena to keep it apart, or call
+        clear_standalone() between groups.
+        """
+        key = (width, height, collision_memory, settings)
+        arena = cls._standalone.get(key)
+        if arena is None:
+            arena = cls._standalone[key] = cls(width, height, collision_memory, settings, decay_on_move=True)
+        return arena
+
+    @classmethod
+    def clear_standalone(cls):
+        """Forget every standalone Arena; blobs created afterwards start a fresh memory and snapshot."""
+        cls._standalone.clear()
+
+class BlobColor:
+    """Mutable (r, g, b) view of a blob's packed color: item writes (0..255) repack the blob's color."""
+    
+    __slots__ = ("blob",)
+    
+    def __init__(self, blob):
+        self.blob = blob
+    
+    def __len__(self):
+        return 3
+    
+    def __getitem__(self, index):
+        return self.blob.rgb[index]
+    
+    def __setitem__(self, index, value):
+        rgb = list(self.blob.rgb)
+        rgb[index] = value
+        self.blob.color = rgb
+    
+    def __iter__(self):
+        return iter(self.blob.rgb)
+    
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return repr(list(self))
 
 class Blob:
-    """A simple colored ball with position, color, and velocity."""
+    """A simple colored ball with position, color, and velocity.
+
+    Blobs use __slots__, keep their color packed into one 0xRRGGBB int and read
+    the world size and collision memory from a shared Arena; blobs created
+    without one share Arena.standalone(). On 64-bit CPython 3.11 a blob takes
+    about 260 bytes (the object plus its four float and two int values),
+    against about 410 bytes with an instance dict, color list and per-blob
+    collision dict (tests/test_blob.py checks the figure).
+    """
+    
+    __slots__ = ("arena", "radius", "x", "y", "vx", "vy", "_rgb", "index")
     
-    def __init__(self, radius, window_width, window_height, x=None, y=None, vx=None, vy=None, color=None):
-        self.window_width = window_width
-        self.window_height = window_height
+    # Stable indices for blobs created without one
+    _indices = itertools.count()
+    
+    def __init__(self, radius, window_width, window_height, x=None, y=None, vx=None, vy=None, color=None,
+                 index=None, collision_memory=None, arena=None, settings=None):
+        if arena is None:
+            arena = Arena.standalone(window_width, window_height, collision_memory, settings)
+        self.arena = arena
         self.radius = radius
+        settings = self.arena.settings
         
-        # Position
-        self.x = random.uniform(radius, window_width - radius)
-        self.y = random.uniform(radius, window_height - radius)
+        # Position (random unless given)
+        self.x = random.uniform(radius, window_width - radius) if x is None else x
+        self.y = random.uniform(radius, window_height - radius) if y is None else y
         
         # Velocity
-        self.vx = random.uniform(-config.NORMAL_SPEED, config.NORMAL_SPEED)
-        self.vy = random.uniform(-config.NORMAL_SPEED, config.NORMAL_SPEED)
+        self.vx = random.uniform(-settings.NORMAL_SPEED, settings.NORMAL_SPEED) if vx is None else vx
+        self.vy = random.uniform(-settings.NORMAL_SPEED, settings.NORMAL_SPEED) if vy is None else vy
         
         # Color
         self.color = [
-            random.randint(config.MINIMUM_COLOR, config.MAXIMUM_COLOR),
-            random.randint(config.MINIMUM_COLOR, config.MAXIMUM_COLOR),
-            random.randint(config.MINIMUM_COLOR, config.MAXIMUM_COLOR)
-        ]
+            random.randint(settings.MINIMUM_COLOR, settings.MAXIMUM_COLOR),
+            random.randint(settings.MINIMUM_COLOR, settings.MAXIMUM_COLOR),
+            random.randint(settings.MINIMUM_COLOR, settings.MAXIMUM_COLOR)
+        ] if color is None else color
         
-        # Collision tracking
-        self.collision_memory = {}  
-        self.collision_decay = config.COLLISION_MEMORY_DECAY
+        # Collision tracking in the arena's shared store, keyed by stable index
+        self.index = next(Blob._indices) if index is None else index
+
+    @property
+    def window_width(self):
+        return self.arena.width
+
+    @property
+    def window_height(self):
+        return self.arena.height
+
+    @property
+    def collision_memory(self):
+        return self.arena.collision_memory
 
-    def search_for_target(self, all_blobs):
-        """Search for the closest blob with a preferential color match."""
+    @property
+    def rgb(self):
+        """The (r, g, b) color as a tuple."""
+        rgb = self._rgb
+        return (rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF)
+
+    @property
+    def color(self):
+        """The (r, g, b) color as a mutable view (blob.color[0] = 150 works); assign a sequence to replace it."""
+        return BlobColor(self)
+
+    @color.setter
+    def color(self, color):
+        r, g, b = int(color[0]), int(color[1]), int(color[2])
+        # Out of range, a channel would spill into its neighbour; negative ints set every high bit
+        if (r | g | b) & ~0xFF:
+            raise ValueError(f"Color channels must be in 0..255 (got {[r, g, b]!r})")
+        self._rgb = (r << 16) | (g << 8) | b
+
+    @property
+    def settings(self):
+        return self.arena.settings
+
+    def color_distance_sq(self, other):
+        """Squared Euclidean RGB distance to another blob's color."""
+        a, b = self._rgb, other._rgb
+        dr = (a >> 16) - (b >> 16)
+        dg = ((a >> 8) & 0xFF) - ((b >> 8) & 0xFF)
+        db = (a & 0xFF) - (b & 0xFF)
+        return dr * dr + dg * dg + db * db
+
+    def color_distance(self, other):
+        """Euclidean RGB distance to another blob's color."""
+        return self.color_distance_sq(other) ** 0.5
+
+    def search_for_target(self, all_blobs, color_index=None, draws=None):
+        """Search for a random blob with a preferential color match and steer towards it.
+
+        draws is this blob's row of uniform draws for the frame (see
+        RandomStreams), used instead of the random module when given.
+        Returns True if a target was found.
+        """
         # Only search occasionally to avoid constant targeting
-        if random.random() > config.TARGET_SEARCH_CHANCE:
-            return
+        settings = self.arena.settings
+        chance = random.random() if draws is None else draws[0]
+        if chance > settings.TARGET_SEARCH_CHANCE:
+            return False
         
+        if color_index is not None:
+            # Draw a match from the neighbouring color buckets
+            target_blob = color_index.random_match(self, draws)
+        else:
+            target_blob = self._scan_for_target(all_blobs)
+        
+        if target_blob is None:
+            return False
+        
+        # Calculate direction to target (with toroidal wrapping)
+        dx = target_blob.x - self.x
+        dy = target_blob.y - self.y
+        
+        # Handle toroidal wrapping
+        width, height = self.arena.width, self.arena.height
+        dx = dx - width * round(dx / width)
+        dy = dy - height * round(dy / height)
+        
+        distance = math.hypot(dx, dy)
+        if distance > 0:
+            # Normalize direction and apply velocity kick
+            dx /= distance
+            dy /= distance
+            
+            self.vx += dx * settings.VELOCITY_KICK_STRENGTH
+            self.vy += dy * settings.VELOCITY_KICK_STRENGTH
+        return True
+
+    def _scan_for_target(self, all_blobs):
+        """Return a random preferential match by scanning a shuffled copy of all blobs."""
         # Shuffle the blob list to get random iteration order
         blob_candidates = list(all_blobs)
         random.shuffle(blob_candidates)
@@ -47,93 +229,83 @@ class Blob:
                 
             # Check if this blob is a preferential match
             if self.is_preferential_match(target_blob):
-                # Calculate direction to target (with toroidal wrapping)
-                dx = target_blob.x - self.x
-                dy = target_blob.y - self.y
-                
-                # Handle toroidal wrapping
-                dx = dx - self.window_width * round(dx / self.window_width)
-                dy = dy - self.window_height * round(dy / self.window_height)
-                
-                distance = math.hypot(dx, dy)
-                if distance > 0:
-                    # Normalize direction and apply velocity kick
-                    dx /= distance
-                    dy /= distance
-                    
-                    self.vx += dx * config.VELOCITY_KICK_STRENGTH
-                    self.vy += dy * config.VELOCITY_KICK_STRENGTH
-                
-                # Found a target, stop searching
-                break
+                return target_blob
+        return None
 
     def is_preferential_match(self, other):
         """Determine if another blob is a preferential match."""
-        # Check for color similarity
-        color_distance = sum((self.color[i] - other.color[i]) ** 2 for i in range(3)) ** 0.5
-        
         # Prefer blobs with similar colors
-        return color_distance < config.FLOCK_COLOR_THRESHOLD
+        return self.color_distance_sq(other) < self.arena.settings.FLOCK_COLOR_THRESHOLD_SQ
 
     def move(self):
-        """Move the blob and wrap around screen edges."""
+        """Move the blob and wrap around screen edges.
+
+        Collision memory is decayed here only if the arena decays on move;
+        otherwise its owner decays it once per frame.
+        """
+        arena = self.arena
+        settings = arena.settings
         current_speed = math.hypot(self.vx, self.vy)
-        if current_speed > config.MAX_SPEED:
+        if current_speed > settings.MAX_SPEED:
             # Apply speed damping
-            self.vx *= config.SPEED_DAMPING
-            self.vy *= config.SPEED_DAMPING
-        elif current_speed < config.NORMAL_SPEED:
+            self.vx *= settings.SPEED_DAMPING
+            self.vy *= settings.SPEED_DAMPING
+        elif current_speed < settings.NORMAL_SPEED:
             # Apply normal speed to maintain typical movement
-            self.vx += config.NORMAL_SPEED
-            self.vy += config.NORMAL_SPEED
+            self.vx += settings.NORMAL_SPEED
+            self.vy += settings.NORMAL_SPEED
         
         # Move
         self.x += self.vx
         self.y += self.vy
         
         # Wrap around screen
-        self.x = self.x % self.window_width
-        self.y = self.y % self.window_height
+        self.x = self.x % arena.width
+        self.y = self.y % arena.height
         
-        # Decay collision memory
         # Blobs that keep colliding bounce off each other more strongly
-        # This makes it so that blobs will eventually bounce normally again after some time
-        for blob_id in list(self.collision_memory.keys()):
-            self.collision_memory[blob_id] *= self.collision_decay
-            if self.collision_memory[blob_id] < 0.1:
-                del self.collision_memory[blob_id]
+        # Decay lets them bounce normally again after some time
+        if arena.decay_on_move:
+            arena.collision_memory.decay(self.index)
 
     def collides_with(self, other):
+        """Check if this blob touches another blob that is not a preferential match."""
         if not self.is_preferential_match(other):
-            """Check if this blob collides with another blob."""
-            dx = self.x - other.x
-            dy = self.y - other.y
-            
-            # Handle toroidal wrapping
-            dx = dx - self.window_width * round(dx / self.window_width)
-            dy = dy - self.window_height * round(dy / self.window_height)
-            
-            distance = math.hypot(dx, dy)
-            return distance < (self.radius + other.radius)
+            return self.touches(other)
+
+    def touches(self, other):
+        """Check if this blob overlaps another blob, across the wrapped edges."""
+        dx = self.x - other.x
+        dy = self.y - other.y
+        
+        # Handle toroidal wrapping
+        width, height = self.arena.width, self.arena.height
+        dx = dx - width * round(dx / width)
+        dy = dy - height * round(dy / height)
+        
+        distance = math.hypot(dx, dy)
+        return distance < (self.radius + other.radius)
+
+    def bounce_off(self, other, draw=None):
+        """Handle collision with another blob - escalating bounce force or flocking.
 
-    def bounce_off(self, other):
-        """Handle collision with another blob - escalating bounce force or flocking."""
+        draw, if given, returns uniform draws for the color bounce instead of the random module.
+        """
         # Calculate collision normal
         dx = self.x - other.x
         dy = self.y - other.y
         
         # Handle toroidal wrapping
-        dx = dx - self.window_width * round(dx / self.window_width)
-        dy = dy - self.window_height * round(dy / self.window_height)
+        width, height = self.arena.width, self.arena.height
+        dx = dx - width * round(dx / width)
+        dy = dy - height * round(dy / height)
         
         distance = math.hypot(dx, dy)
         if distance == 0:
             return
             
         # Check if colors are similar enough for flocking
-        color_distance = sum((self.color[i] - other.color[i]) ** 2 for i in range(3)) ** 0.5
-        
-        if color_distance < config.FLOCK_COLOR_THRESHOLD:
+        if self.color_distance_sq(other) < self.arena.settings.FLOCK_COLOR_THRESHOLD_SQ:
             # FLOCKING BEHAVIOR: Move as one unit
             # Average the velocities so they move together
             avg_vx = (self.vx + other.vx) / 2
@@ -148,12 +320,7 @@ class Blob:
             # They maintain their similar colors
             
             # Reset collision memory since they're now moving together
-            other_id = id(other)
-            self_id = id(self)
-            if other_id in self.collision_memory:
-                del self.collision_memory[other_id]
-            if self_id in other.collision_memory:
-                del other.collision_memory[self_id]
+            self.collision_memory.forget(self.index, other.index)
                 
         else:
             # NORMAL BOUNCING BEHAVIOR: Different colors bounce off each other
@@ -161,22 +328,11 @@ class Blob:
             dx /= distance
             dy /= distance
             
-            # Track collision intensity
-            other_id = id(other)
-            if other_id not in self.collision_memory:
-                self.collision_memory[other_id] = 1.0
-            else:
-                self.collision_memory[other_id] = min(10.0, self.collision_memory[other_id] + 1.0)
-            
-            # Do the same for the other blob
-            self_id = id(self)
-            if self_id not in other.collision_memory:
-                other.collision_memory[self_id] = 1.0
-            else:
-                other.collision_memory[self_id] = min(10.0, other.collision_memory[self_id] + 1.0)
+            # Track collision intensity (shared by both blobs of the pair)
+            intensity = self.collision_memory.bump(self.index, other.index)
             
             # Calculate bounce intensity based on collision history
-            bounce_multiplier = max(1.0, self.collision_memory[other_id])
+            bounce_multiplier = max(1.0, intensity)
             
             # Simple velocity swap along collision normal with escalating force
             v1_normal = self.vx * dx + self.vy * dy
@@ -197,30 +353,41 @@ class Blob:
             other.vx -= dx * separation_force
             other.vy -= dy * separation_force
 
-            self.color_bounce(other)
+            self.color_bounce(other, draw)
             
-    def color_bounce(self, other):
+    def color_bounce(self, other, draw=None):
         # Add some color mixing on collision (only for bouncing blobs)
+        color, other_color = list(self.rgb), list(other.rgb)
+        # clamp[c + offset] is c clamped to the configured color range
+        settings = self.arena.settings
+        clamp, offset = settings.COLOR_CLAMP, settings.COLOR_CLAMP_OFFSET
         for i in range(3):
             # Instead of averaging colors, make them bounce apart
-            diff = self.color[i] - other.color[i]
+            diff = color[i] - other_color[i]
             
             # Add random variation to the bounce
-            bounce_strength = random.randint(10, 30)
+            bounce_strength = random.randint(10, 30) if draw is None else 10 + int(draw() * 21)
             
             if diff > 0:
                 # self has higher value, push it higher and other lower
-                self.color[i] = max(config.MINIMUM_COLOR, min(config.MAXIMUM_COLOR, self.color[i] + bounce_strength))
-                other.color[i] = max(config.MINIMUM_COLOR, min(config.MAXIMUM_COLOR, other.color[i] - bounce_strength))
+                color[i] = clamp[color[i] + bounce_strength + offset]
+                other_color[i] = clamp[other_color[i] - bounce_strength + offset]
             elif diff < 0:
                 # other has higher value, push it higher and self lower
-                self.color[i] = max(config.MINIMUM_COLOR, min(config.MAXIMUM_COLOR, self.color[i] - bounce_strength))
-                other.color[i] = max(config.MINIMUM_COLOR, min(config.MAXIMUM_COLOR, other.color[i] + bounce_strength))
+                color[i] = clamp[color[i] - bounce_strength + offset]
+                other_color[i] = clamp[other_color[i] + bounce_strength + offset]
             else:
                 # Colors are the same, push them in random directions
-                if random.choice([True, False]):
-                    self.color[i] = max(config.MINIMUM_COLOR, min(config.MAXIMUM_COLOR, self.color[i] + bounce_strength))
-                    other.color[i] = max(config.MINIMUM_COLOR, min(config.MAXIMUM_COLOR, other.color[i] - bounce_strength))
+                if draw is None:
+                    up = random.choice([True, False])
                 else:
-                    self.color[i] = max(config.MINIMUM_COLOR, min(config.MAXIMUM_COLOR, self.color[i] - bounce_strength))
-                    other.color[i] = max(config.MINIMUM_COLOR, min(config.MAXIMUM_COLOR, other.color[i] + bounce_strength))
\ No newline at end of file
+                    up = draw() < 0.5
+                if up:
+                    color[i] = clamp[color[i] + bounce_strength + offset]
+                    other_color[i] = clamp[other_color[i] - bounce_strength + offset]
+                else:
+                    color[i] = clamp[color[i] - bounce_strength + offset]
+                    other_color[i] = clamp[other_color[i] + bounce_strength + offset]
+        
+        self.color = color
+        other.color = other_color
\ No newline at end of file
@@ -0,0 +1,62 @@
+# Camera: which part of the wrapping world the window shows, and at what zoom
+import numpy as np
+
+class Camera:
+    """Maps world coordinates to window pixels for a view onto a toroidal world.
+
+    (left, top) is the world point at the window's top-left corner, always
+    wrapped into the world, and zoom is window pixels per world unit. Zoom
+    never drops below the level at which the view spans the whole world along
+    one axis, so every blob shows up at most once.
+    """
+
+    MAX_ZOOM = 16.0
+
+    def __init__(self, world_width, world_height, view_width, view_height, zoom=1.0):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.view_width = view_width
+        self.view_height = view_height
+        self.min_zoom = max(view_width / world_width, view_height / world_height)
+        self.zoom = min(self.MAX_ZOOM, max(self.min_zoom, zoom))
+        self.left = 0.0
+        self.top = 0.0
+
+    @property
+    def is_identity(self):
+        """True if world coordinates are window pixels (the whole world fills the window at zoom 1)."""
+        return (self.zoom == 1.0 and self.left == 0.0 and self.top == 0.0
+                and (self.view_width, self.view_height) == (self.world_width, self.world_height))
+
+    def pan(self, dx, dy):
+        """Move the view by (dx, dy) window pixels."""
+        self.left = (self.left + dx / self.zoom) % self.world_width
+        self.top = (self.top + dy / self.zoom) % self.world_height
+
+    def zoom_at(self, factor, sx, sy):
+        """Zoom by factor, keeping the world point under window pixel (sx, sy) in place."""
+        x, y = self.left + sx / self.zoom, self.top + sy / self.zoom
+        self.zoom = min(self.MAX_ZOOM, max(self.min_zoom, self.zoom * factor))
+        self.left = (x - sx / self.zoom) % self.world_width
+        self.top = (y - sy / self.zoom) % self.world_height
+
+    def center_on(self, x, y):
+        """Put world point (x, y) at the middle of the window."""
+        self.left = (x - self.view_width / (2 * self.zoom)) % self.world_width
+        self.top = (y - self.view_height / (2 * self.zoom)) % self.world_height
+
+    def visible_rect(self, margin=0.0):
+        """Return (left, top, width, height) of the world area in view, grown by margin world units each side."""
+        return (self.left - margin, self.top - margin,
+                self.view_width / self.zoom + 2 * margin, self.view_height / self.zoom + 2 * margin)
+
+    def to_screen(self, x, y, margin=0.0):
+        """Return window pixel coordinates of world positions.
+
+        Positions are unwrapped relative to the view, so a blob up to margin
+        world units left of or above the view lands just off the window
+        instead of a world-width away.
+        """
+        sx = ((np.asarray(x) - self.left + margin) % self.world_width - margin) * self.zoom
+        sy = ((np.asarray(y) - self.top + margin) % self.world_height - margin) * self.zoom
+        return sx, sy
@@ -0,0 +1,68 @@
+# Atomic checkpoints of the complete world state
+import json
+import os
+import numpy as np
+from Config import config
+
+CHECKPOINT_VERSION = 2
+
+# Settings that shape how the world evolves; a resumed run takes these from the
+# checkpoint, while run settings (max_frames, display, logging, ...) stay as configured
+RESTORED_SETTINGS = (
+    "NUM_BLOBS", "BLOB_RADIUS", "WIDTH", "HEIGHT", "BACKEND",
+    "SPEED_DAMPING", "MAX_SPEED", "NORMAL_SPEED", "VELOCITY_KICK_STRENGTH",
+    "MINIMUM_COLOR", "MAXIMUM_COLOR",
+    "COLLISION_MEMORY_DECAY", "TARGET_SEARCH_CHANCE", "FLOCK_COLOR_THRESHOLD", "COLOR_ATTRACTION_THRESHOLD", "FLOCKS",
+)
+
+def save_checkpoint(path, world, frame, seed=None):
+    """Write the world state after `frame` frames to path, replacing it atomically.
+
+    The file is an uncompressed .npz archive: one array per state column plus
+    a JSON "meta" entry holding the frame count, the seed, the world's settings
+    and its generator state. It is written to a temporary file first, so a crash mid-write leaves the
+    previous checkpoint intact.
+    """
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "frame": frame,
+        "seed": seed,
+        "config": world.settings.values(),
+        "numpy_random": world.rng.bit_generator.state,
+    }
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8), **world.state())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def load_checkpoint(path, settings=None):
+    """Restore a checkpoint and return (world, frame, seed).
+
+    The world gets settings (a fresh config snapshot by default) with the
+    checkpointed RESTORED_SETTINGS applied; the global config is left alone.
+    The world's generator is put back in its checkpointed state, so stepping
+    the returned world continues the original run exactly.
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        meta = json.loads(archive["meta"].tobytes())
+        if meta.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{path}: unsupported checkpoint version {meta.get('version')}")
+        state = {name: archive[name] for name in archive.files if name != "meta"}
+
+    settings = config.snapshot() if settings is None else settings
+    settings = settings.replace(**{name: meta["config"][name] for name in RESTORED_SETTINGS if name in meta["config"]})
+
+    if settings.BACKEND == "numpy":
+        from World import World
+        world = World.from_state(state, settings.WIDTH, settings.HEIGHT, meta["numpy_random"], settings)
+    elif settings.BACKEND == "parallel":
+        from ParallelWorld import ParallelWorld
+        world = ParallelWorld.from_state(state, settings.WIDTH, settings.HEIGHT, meta["numpy_random"],
+                                         settings.WORKERS, settings)
+    else:
+        from Population import Population
+        world = Population.from_state(state, settings.BLOB_RADIUS, settings.WIDTH, settings.HEIGHT,
+                                      meta["numpy_random"], settings)
+    return world, meta["frame"], meta["seed"]
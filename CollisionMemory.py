@@ -0,0 +1,130 @@
+# Shared collision memory for every pair of blobs
+import numpy as np
+from Config import config
+
+class CollisionMemory:
+    """Collision intensity per pair of blob indices, decayed in one pass per frame.
+
+    A dict maps each live pair to a slot in flat NumPy arrays, so a bounce reads
+    and bumps its pair in O(1) while decay and eviction touch every pair at once.
+    A second dict maps each lower blob index to the slots of its pairs, so
+    decaying one blob's pairs touches only those.
+    """
+
+    FORGET_BELOW = 0.1
+    MAX_INTENSITY = 10.0
+
+    def __init__(self, capacity=64, decay=None):
+        self.decay_rate = config.COLLISION_MEMORY_DECAY if decay is None else decay
+        self.min_capacity = capacity
+        self._allocate_arrays(capacity)
+        self.slots = {}
+        self.slots_by_lower = {}
+
+    def _allocate_arrays(self, capacity):
+        self.pairs = np.zeros((capacity, 2), dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self.slots)
+
+    @staticmethod
+    def _key(i, j):
+        return (i, j) if i < j else (j, i)
+
+    def get(self, i, j):
+        """Return the current intensity between blobs i and j (0 if none)."""
+        slot = self.slots.get(self._key(i, j))
+        return 0.0 if slot is None else float(self.values[slot])
+
+    def bump(self, i, j):
+        """Record a collision between blobs i and j and return the new intensity."""
+        key = self._key(i, j)
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self._claim_slot(key)
+            intensity = 1.0
+        else:
+            intensity = min(self.MAX_INTENSITY, float(self.values[slot]) + 1.0)
+        self.values[slot] = intensity
+        return intensity
+
+    def forget(self, i, j):
+        """Drop the pair of blobs i and j from memory."""
+        key = self._key(i, j)
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self._unlink(key[0], slot)
+            self.live[slot] = False
+            self.values[slot] = 0.0
+            self.free.append(slot)
+
+    def decay(self, lower=None):
+        """Fade every pair once and evict the ones that dropped below FORGET_BELOW.
+
+        With lower, only the pairs (lower, j) fade.
+        """
+        if lower is None:
+            self.values *= self.decay_rate
+            faded = np.flatnonzero(self.live & (self.values < self.FORGET_BELOW))
+        else:
+            slots = self.slots_by_lower.get(lower)
+            if not slots:
+                return
+            fading = np.fromiter(slots, dtype=np.int64, count=len(slots))
+            self.values[fading] *= self.decay_rate
+            faded = fading[self.values[fading] < self.FORGET_BELOW]
+        for slot, (i, j) in zip(faded.tolist(), self.pairs[faded].tolist()):
+            del self.slots[(i, j)]
+            self._unlink(i, slot)
+        self.live[faded] = False
+        self.values[faded] = 0.0
+        self.free.extend(faded.tolist())
+
+        # Give memory back once most slots are unused
+        if len(self.slots) < len(self.values) // 4 and len(self.values) > self.min_capacity:
+            self._resize(max(self.min_capacity, 2 * len(self.slots)))
+
+    def _claim_slot(self, key):
+        if not self.free:
+            self._resize(2 * len(self.values))
+        slot = self.free.pop()
+        self.slots[key] = slot
+        self.slots_by_lower.setdefault(key[0], set()).add(slot)
+        self.pairs[slot] = key
+        self.live[slot] = True
+        return slot
+
+    def live_entries(self):
+        """Return copies of the (pairs, values) arrays of every live pair."""
+        used = np.flatnonzero(self.live)
+        return self.pairs[used], self.values[used]
+
+    def load(self, pairs, values, capacity=None):
+        """Replace the whole memory with the given (i, j) pairs (i < j) and intensities."""
+        count = len(values)
+        if capacity is None:
+            capacity = max(self.min_capacity, count)
+        self._allocate_arrays(capacity)
+        self.pairs[:count] = pairs
+        self.values[:count] = values
+        self.live[:count] = True
+        self.free = list(range(capacity - 1, count - 1, -1))
+        self.slots = {(i, j): slot for slot, (i, j) in enumerate(self.pairs[:count].tolist())}
+        self.slots_by_lower = {}
+        for (i, j), slot in self.slots.items():
+            self.slots_by_lower.setdefault(i, set()).add(slot)
+
+    def _unlink(self, lower, slot):
+        """Drop slot from the slots of its lower blob index."""
+        slots = self.slots_by_lower[lower]
+        slots.discard(slot)
+        if not slots:
+            del self.slots_by_lower[lower]
+
+    def _resize(self, capacity):
+        """Move every live pair into freshly allocated arrays of the given capacity."""
+        pairs, values = self.live_entries()
+        self.load(pairs, values, capacity)
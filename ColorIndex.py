@@ -0,0 +1,78 @@
+# Color-space index for finding similarly-colored blobs
+import random
+from Config import config
+
+class ColorIndex:
+    """Buckets blobs on an RGB grid whose cells are one flocking threshold wide.
+
+    Any preferential match of a blob lies in its own bucket or one of the 26
+    around it, so a target can be drawn from that neighbourhood instead of
+    shuffling the whole population.
+    """
+
+    # Random probes into the neighbourhood before falling back to a full scan of it
+    MAX_PROBES = 32
+
+    def __init__(self, blobs=(), threshold=None):
+        self.threshold = config.FLOCK_COLOR_THRESHOLD if threshold is None else threshold
+        self.buckets = {}
+        self.neighbourhoods = {}
+        self.rebuild(blobs)
+
+    def rebuild(self, blobs):
+        """Re-bucket every blob by its current color (call after colors change)."""
+        self.buckets = {}
+        self.neighbourhoods = {}
+        if self.threshold <= 0:
+            return
+        for blob in blobs:
+            self.buckets.setdefault(self._key(blob.rgb), []).append(blob)
+
+    def _key(self, color):
+        return (int(color[0] // self.threshold), int(color[1] // self.threshold), int(color[2] // self.threshold))
+
+    def _neighbourhood(self, key):
+        """Return the non-empty buckets around a bucket key and their total size."""
+        if key not in self.neighbourhoods:
+            r, g, b = key
+            members = [
+                self.buckets[(r + dr, g + dg, b + db)]
+                for dr in (-1, 0, 1) for dg in (-1, 0, 1) for db in (-1, 0, 1)
+                if (r + dr, g + dg, b + db) in self.buckets
+            ]
+            self.neighbourhoods[key] = (members, sum(len(bucket) for bucket in members))
+        return self.neighbourhoods[key]
+
+    def random_match(self, blob, draws=None):
+        """Return a uniformly random other blob with a preferential color match, or None.
+
+        draws, if given, is a blob's row of uniform [0, 1) frame draws (see
+        RandomStreams) used instead of the random module: draws[0] belongs to
+        the caller, draws[1:-1] feed the probes and draws[-1] the fallback pick.
+        """
+        if not self.buckets:
+            return None
+        buckets, total = self._neighbourhood(self._key(blob.rgb))
+        if total <= 1:
+            return None
+
+        # Rejection sampling: uniform over the neighbourhood, so uniform over the matches in it
+        probes = self.MAX_PROBES if draws is None else len(draws) - 2
+        for probe in range(probes):
+            pick = random.randrange(total) if draws is None else int(draws[probe + 1] * total)
+            for bucket in buckets:
+                if pick < len(bucket):
+                    candidate = bucket[pick]
+                    break
+                pick -= len(bucket)
+            if candidate is not blob and blob.is_preferential_match(candidate):
+                return candidate
+
+        # Sparse neighbourhood: collect every match and pick one
+        matches = [
+            candidate for bucket in buckets for candidate in bucket
+            if candidate is not blob and blob.is_preferential_match(candidate)
+        ]
+        if not matches:
+            return None
+        return random.choice(matches) if draws is None else matches[int(draws[-1] * len(matches))]
@@ -1,4 +1,5 @@
 import json
+import numbers
 import os
 
 class Config:
@@ -12,8 +13,17 @@ class Config:
             cls._instance._load_config()
         return cls._instance
     
-    def _load_config(self):
-        """Load configuration from config.json file."""
+    def _load_config(self, overrides=None):
+        """Load configuration from config.json file, then apply any overrides."""
+        self._assign_config_values(self._read_config_data(overrides))
+    
+    def _read_config_data(self, overrides=None):
+        """Parse config.json into nested section dicts and apply any overrides.
+
+        Overrides map "section.key" names to values, e.g.
+        {"physics.max_speed": 3.0}. A name that is not a key of the default
+        config raises ValueError, so a typo cannot go unnoticed.
+        """
         config_file = os.path.join(os.path.dirname(__file__), 'config.json')
         try:
             with open(config_file, 'r') as f:
@@ -25,8 +35,15 @@ class Config:
             print(f"Error parsing config file: {e}. Using default values.")
             config_data = self._get_default_config()
         
-        # Assign configuration values to explicit class variables
-        self._assign_config_values(config_data)
+        defaults = self._get_default_config()
+        for name, value in (overrides or {}).items():
+            section, _, key = name.partition(".")
+            if not key:
+                raise ValueError(f"Config override {name!r} must look like 'section.key'")
+            if key not in defaults.get(section, {}):
+                raise ValueError(f"Unknown config override {name!r}: no setting {key!r} in section {section!r}")
+            config_data.setdefault(section, {})[key] = value
+        return config_data
     
     def _get_default_config(self):
         """Return default configuration values."""
@@ -39,10 +56,27 @@ class Config:
                 "max_frames": 0,  # 0 = infinite, >0 = run for that many frames
                 "enable_display": True,
                 "width": 1920,
-                "height": 1080
+                "height": 1080,
+                "backend": "objects",  # "objects" = Blob list, "numpy" = World arrays, "parallel" = World over worker processes
+                "workers": 0,  # worker processes of the parallel backend, 0 = one per core
+                "log_format": "text",  # "text" = readable lines, "binary" = SnapshotLog frames
+                "async_log": False,  # write logs on a background thread
+                "log_queue_size": 8,
+                "log_backpressure": "block",  # "block", "drop_oldest" or "coalesce" when the queue is full
+                "tick_rate": 0,  # 0 = one tick per rendered frame, >0 = fixed simulation ticks per second
+                "max_catchup_ticks": 5,  # ticks run back to back before the simulation gives up catching up
+                "checkpoint_interval_frames": 0  # 0 = no checkpoints, >0 = save world state every N frames
             },
             "display": {
-                "background_color": [20, 20, 30]
+                "background_color": [20, 20, 30],
+                "batched_rendering": True,  # cached sprites drawn with one blits call
+                "sprite_cache_size": 4096,
+                "sprite_color_step": 8,  # colors are quantized to this step for sprite reuse
+                "window_width": 0,  # window size, 0 = the world size; smaller windows show a camera view
+                "window_height": 0,
+                "lod_zoom": 0.5,  # below this zoom blobs are drawn as a density map
+                "splat_size": 4,  # density map cell size in window pixels
+                "pan_speed": 16  # window pixels per frame while an arrow key is held
             },
             "physics": {
                 "speed_damping": 0.98,
@@ -57,7 +91,31 @@ class Config:
             "behavior": {
                 "collision_memory_decay": 0.9,
                 "target_search_chance": 1.01,
-                "flock_color_threshold": 50
+                "flock_color_threshold": 50,
+                "flocks": "off"  # "off", "track" = report flocks, "align" = also give each flock its mean velocity
+            },
+            "instrumentation": {
+                "enabled": False,
+                "export_interval_frames": 300,
+                "histogram_window": 1000,
+                "profile_start_frame": 0,
+                "profile_frames": 0  # 0 = no cProfile window
+            },
+            "export": {
+                "enabled": False,  # render frames offscreen and save them next to the log
+                "format": "png",  # "png" = one image per frame, "raw" = rgb24 video stream
+                "interval_frames": 1,
+                "workers": 0,  # encoding processes, 0 = one per core
+                "memory_budget_mb": 256,  # images in flight before the simulation waits
+                "png_compression": 6
+            },
+            "server": {
+                "enabled": False,  # stream frames to TCP clients (see watch.py)
+                "host": "127.0.0.1",
+                "port": 8765,  # 0 = any free port
+                "max_client_fps": 30,  # frames per second sent to each client at most
+                "keyframe_interval": 300,  # full frame every N messages per client, 0 = only the first
+                "max_clients": 16
             }
         }
     
@@ -72,10 +130,27 @@ class Config:
         self.ENABLE_DISPLAY = config_data.get("simulation", {}).get("enable_display", True)
         self.WIDTH = config_data.get("simulation", {}).get("width", 1920)
         self.HEIGHT = config_data.get("simulation", {}).get("height", 1080)
+        self.BACKEND = config_data.get("simulation", {}).get("backend", "objects")
+        self.WORKERS = config_data.get("simulation", {}).get("workers", 0)
+        self.LOG_FORMAT = config_data.get("simulation", {}).get("log_format", "text")
+        self.ASYNC_LOG = config_data.get("simulation", {}).get("async_log", False)
+        self.LOG_QUEUE_SIZE = config_data.get("simulation", {}).get("log_queue_size", 8)
+        self.LOG_BACKPRESSURE = config_data.get("simulation", {}).get("log_backpressure", "block")
+        self.TICK_RATE = config_data.get("simulation", {}).get("tick_rate", 0)
+        self.MAX_CATCHUP_TICKS = config_data.get("simulation", {}).get("max_catchup_ticks", 5)
+        self.CHECKPOINT_INTERVAL_FRAMES = config_data.get("simulation", {}).get("checkpoint_interval_frames", 0)
         
         # Display constants
         bg_color = config_data.get("display", {}).get("background_color", [20, 20, 30])
         self.BACKGROUND_COLOR = tuple(bg_color)
+        self.BATCHED_RENDERING = config_data.get("display", {}).get("batched_rendering", True)
+        self.SPRITE_CACHE_SIZE = config_data.get("display", {}).get("sprite_cache_size", 4096)
+        self.SPRITE_COLOR_STEP = config_data.get("display", {}).get("sprite_color_step", 8)
+        self.WINDOW_WIDTH = config_data.get("display", {}).get("window_width", 0)
+        self.WINDOW_HEIGHT = config_data.get("display", {}).get("window_height", 0)
+        self.LOD_ZOOM = config_data.get("display", {}).get("lod_zoom", 0.5)
+        self.SPLAT_SIZE = config_data.get("display", {}).get("splat_size", 4)
+        self.PAN_SPEED = config_data.get("display", {}).get("pan_speed", 16)
         
         # Physics constants
         self.SPEED_DAMPING = config_data.get("physics", {}).get("speed_damping", 0.98)
@@ -91,13 +166,46 @@ class Config:
         self.COLLISION_MEMORY_DECAY = config_data.get("behavior", {}).get("collision_memory_decay", 0.9)
         self.TARGET_SEARCH_CHANCE = config_data.get("behavior", {}).get("target_search_chance", 1.01)
         self.FLOCK_COLOR_THRESHOLD = config_data.get("behavior", {}).get("flock_color_threshold", 50)
+        self.FLOCKS = config_data.get("behavior", {}).get("flocks", "off")
+        
+        # Instrumentation constants
+        self.METRICS_ENABLED = config_data.get("instrumentation", {}).get("enabled", False)
+        self.METRICS_INTERVAL_FRAMES = config_data.get("instrumentation", {}).get("export_interval_frames", 300)
+        self.METRICS_WINDOW = config_data.get("instrumentation", {}).get("histogram_window", 1000)
+        self.PROFILE_START_FRAME = config_data.get("instrumentation", {}).get("profile_start_frame", 0)
+        self.PROFILE_FRAMES = config_data.get("instrumentation", {}).get("profile_frames", 0)
+        self.EXPORT_ENABLED = config_data.get("export", {}).get("enabled", False)
+        self.EXPORT_FORMAT = config_data.get("export", {}).get("format", "png")
+        self.EXPORT_INTERVAL_FRAMES = config_data.get("export", {}).get("interval_frames", 1)
+        self.EXPORT_WORKERS = config_data.get("export", {}).get("workers", 0)
+        self.EXPORT_MEMORY_BUDGET_MB = config_data.get("export", {}).get("memory_budget_mb", 256)
+        self.EXPORT_PNG_COMPRESSION = config_data.get("export", {}).get("png_compression", 6)
+        
+        # Frame streaming server
+        self.SERVER_ENABLED = config_data.get("server", {}).get("enabled", False)
+        self.SERVER_HOST = config_data.get("server", {}).get("host", "127.0.0.1")
+        self.SERVER_PORT = config_data.get("server", {}).get("port", 8765)
+        self.SERVER_MAX_CLIENT_FPS = config_data.get("server", {}).get("max_client_fps", 30)
+        self.SERVER_KEYFRAME_INTERVAL = config_data.get("server", {}).get("keyframe_interval", 300)
+        self.SERVER_MAX_CLIENTS = config_data.get("server", {}).get("max_clients", 16)
         
         # Derived constants (computed from other values)
         self.COLOR_ATTRACTION_THRESHOLD = self.FLOCK_COLOR_THRESHOLD  # Keep attraction and flocking in sync
     
-    def reload(self):
-        """Reload configuration from file."""
-        self._load_config()
+    def reload(self, overrides=None):
+        """Reload configuration from file, applying optional "section.key" overrides.
+
+        Returns a new RunConfig snapshot and leaves this config as it was, so
+        neither it nor worlds built from earlier snapshots change.
+        """
+        # A detached Config (object.__new__ skips the singleton) holds the fresh values
+        fresh = object.__new__(Config)
+        fresh._assign_config_values(self._read_config_data(overrides))
+        return fresh.snapshot()
+    
+    def snapshot(self):
+        """Return a frozen, validated RunConfig of the current values."""
+        return RunConfig(**{name: value for name, value in vars(self).items() if name.isupper()})
     
     def __str__(self):
         """Return a string representation of all configuration values."""
@@ -108,9 +216,26 @@ Simulation:
   FPS = {self.FPS}
   WIDTH = {self.WIDTH}
   HEIGHT = {self.HEIGHT}
+  BACKEND = {self.BACKEND}
+  WORKERS = {self.WORKERS}
+  LOG_FORMAT = {self.LOG_FORMAT}
+  ASYNC_LOG = {self.ASYNC_LOG}
+  LOG_QUEUE_SIZE = {self.LOG_QUEUE_SIZE}
+  LOG_BACKPRESSURE = {self.LOG_BACKPRESSURE}
+  TICK_RATE = {self.TICK_RATE}
+  MAX_CATCHUP_TICKS = {self.MAX_CATCHUP_TICKS}
+  CHECKPOINT_INTERVAL_FRAMES = {self.CHECKPOINT_INTERVAL_FRAMES}
 
 Display:
   BACKGROUND_COLOR = {self.BACKGROUND_COLOR}
+  BATCHED_RENDERING = {self.BATCHED_RENDERING}
+  SPRITE_CACHE_SIZE = {self.SPRITE_CACHE_SIZE}
+  SPRITE_COLOR_STEP = {self.SPRITE_COLOR_STEP}
+  WINDOW_WIDTH = {self.WINDOW_WIDTH}
+  WINDOW_HEIGHT = {self.WINDOW_HEIGHT}
+  LOD_ZOOM = {self.LOD_ZOOM}
+  SPLAT_SIZE = {self.SPLAT_SIZE}
+  PAN_SPEED = {self.PAN_SPEED}
 
 Physics:
   SPEED_DAMPING = {self.SPEED_DAMPING}
@@ -127,7 +252,117 @@ Behavior:
   TARGET_SEARCH_CHANCE = {self.TARGET_SEARCH_CHANCE}
   FLOCK_COLOR_THRESHOLD = {self.FLOCK_COLOR_THRESHOLD}
   COLOR_ATTRACTION_THRESHOLD = {self.COLOR_ATTRACTION_THRESHOLD}
+  FLOCKS = {self.FLOCKS}
+
+Instrumentation:
+  METRICS_ENABLED = {self.METRICS_ENABLED}
+  METRICS_INTERVAL_FRAMES = {self.METRICS_INTERVAL_FRAMES}
+  METRICS_WINDOW = {self.METRICS_WINDOW}
+  PROFILE_START_FRAME = {self.PROFILE_START_FRAME}
+  PROFILE_FRAMES = {self.PROFILE_FRAMES}
+
+Export:
+  EXPORT_ENABLED = {self.EXPORT_ENABLED}
+  EXPORT_FORMAT = {self.EXPORT_FORMAT}
+  EXPORT_INTERVAL_FRAMES = {self.EXPORT_INTERVAL_FRAMES}
+  EXPORT_WORKERS = {self.EXPORT_WORKERS}
+  EXPORT_MEMORY_BUDGET_MB = {self.EXPORT_MEMORY_BUDGET_MB}
+  EXPORT_PNG_COMPRESSION = {self.EXPORT_PNG_COMPRESSION}
+
+Server:
+  SERVER_ENABLED = {self.SERVER_ENABLED}
+  SERVER_HOST = {self.SERVER_HOST}
+  SERVER_PORT = {self.SERVER_PORT}
+  SERVER_MAX_CLIENT_FPS = {self.SERVER_MAX_CLIENT_FPS}
+  SERVER_KEYFRAME_INTERVAL = {self.SERVER_KEYFRAME_INTERVAL}
+  SERVER_MAX_CLIENTS = {self.SERVER_MAX_CLIENTS}
 """
 
+class RunConfig:
+    """Frozen, validated configuration of one run, built once by Config.snapshot().
+
+    Worlds and blobs read their settings from a RunConfig instead of the
+    global config, so differently configured worlds can share a process and
+    reloading the config never changes a world mid-frame. Besides every
+    config value it holds values derived for the hot paths:
+
+    FLOCK_COLOR_THRESHOLD_SQ  squared threshold, compared with squared color distances
+    COLOR_CLAMP               COLOR_CLAMP[c + COLOR_CLAMP_OFFSET] is channel value c clamped to
+                              [MINIMUM_COLOR, MAXIMUM_COLOR], for c in 0..255 pushed by up to
+                              COLOR_CLAMP_OFFSET either way
+    """
+
+    COLOR_CLAMP_OFFSET = 30
+
+    CHOICES = {
+        "BACKEND": ("objects", "numpy", "parallel"),
+        "LOG_FORMAT": ("text", "binary"),
+        "LOG_BACKPRESSURE": ("block", "drop_oldest", "coalesce"),
+        "FLOCKS": ("off", "track", "align"),
+        "EXPORT_FORMAT": ("png", "raw"),
+    }
+    POSITIVE = ("BLOB_RADIUS", "WIDTH", "HEIGHT", "FPS", "LOG_INTERVAL_FRAMES", "SPEED_DAMPING",
+                "COLLISION_MEMORY_DECAY", "EXPORT_INTERVAL_FRAMES", "METRICS_INTERVAL_FRAMES", "SPLAT_SIZE",
+                "SERVER_MAX_CLIENT_FPS", "LOG_QUEUE_SIZE", "MAX_CATCHUP_TICKS", "SPRITE_CACHE_SIZE",
+                "SPRITE_COLOR_STEP", "METRICS_WINDOW", "EXPORT_MEMORY_BUDGET_MB")
+    NON_NEGATIVE = ("NUM_BLOBS", "MAX_FRAMES", "MAX_SPEED", "NORMAL_SPEED", "VELOCITY_KICK_STRENGTH",
+                    "TARGET_SEARCH_CHANCE", "FLOCK_COLOR_THRESHOLD", "TICK_RATE", "CHECKPOINT_INTERVAL_FRAMES",
+                    "WORKERS", "EXPORT_WORKERS", "WINDOW_WIDTH", "WINDOW_HEIGHT", "LOD_ZOOM", "PAN_SPEED",
+                    "SERVER_PORT", "SERVER_KEYFRAME_INTERVAL", "SERVER_MAX_CLIENTS", "PROFILE_START_FRAME",
+                    "PROFILE_FRAMES")
+    # Checked against their own ranges in _validate
+    RANGED = ("MINIMUM_COLOR", "MAXIMUM_COLOR", "EXPORT_PNG_COMPRESSION")
+
+    def __init__(self, **values):
+        object.__setattr__(self, "_names", tuple(values))
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+        self._validate()
+
+        low, high, push = self.MINIMUM_COLOR, self.MAXIMUM_COLOR, self.COLOR_CLAMP_OFFSET
+        object.__setattr__(self, "FLOCK_COLOR_THRESHOLD_SQ", self.FLOCK_COLOR_THRESHOLD ** 2)
+        object.__setattr__(self, "COLOR_CLAMP", tuple(max(low, min(high, c)) for c in range(-push, 256 + push)))
+
+    def _validate(self):
+        problems = []
+        for name, choices in self.CHOICES.items():
+            if getattr(self, name) not in choices:
+                problems.append(f"{name} must be one of {', '.join(choices)} (got {getattr(self, name)!r})")
+        # Numbers only from here on, so a string or None is reported rather than failing a comparison
+        not_numbers = set()
+        for name in self.POSITIVE + self.NON_NEGATIVE + self.RANGED:
+            value = getattr(self, name)
+            if isinstance(value, bool) or not isinstance(value, numbers.Real):
+                not_numbers.add(name)
+                problems.append(f"{name} must be a number (got {value!r})")
+        for name in self.POSITIVE:
+            if name not in not_numbers and not getattr(self, name) > 0:
+                problems.append(f"{name} must be positive (got {getattr(self, name)!r})")
+        for name in self.NON_NEGATIVE:
+            if name not in not_numbers and not getattr(self, name) >= 0:
+                problems.append(f"{name} must not be negative (got {getattr(self, name)!r})")
+        colors = not not_numbers & {"MINIMUM_COLOR", "MAXIMUM_COLOR"}
+        if colors and not 0 <= self.MINIMUM_COLOR <= self.MAXIMUM_COLOR <= 255:
+            problems.append(f"MINIMUM_COLOR and MAXIMUM_COLOR must satisfy 0 <= minimum <= maximum <= 255 "
+                            f"(got {self.MINIMUM_COLOR!r}, {self.MAXIMUM_COLOR!r})")
+        if "COLLISION_MEMORY_DECAY" not in not_numbers and self.COLLISION_MEMORY_DECAY > 1:
+            problems.append(f"COLLISION_MEMORY_DECAY must be at most 1 (got {self.COLLISION_MEMORY_DECAY!r})")
+        if "EXPORT_PNG_COMPRESSION" not in not_numbers and not 0 <= self.EXPORT_PNG_COMPRESSION <= 9:
+            problems.append(f"EXPORT_PNG_COMPRESSION must be a zlib level from 0 to 9 "
+                            f"(got {self.EXPORT_PNG_COMPRESSION!r})")
+        if problems:
+            raise ValueError("Invalid configuration: " + "; ".join(problems))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"RunConfig is frozen; use replace({name}=...) for a changed copy")
+
+    def values(self):
+        """Return the config values (without derived ones) as a dict."""
+        return {name: getattr(self, name) for name in self._names}
+
+    def replace(self, **changes):
+        """Return a new RunConfig with some values changed."""
+        return RunConfig(**{**self.values(), **changes})
+
 # Static instance for easy access
 config = Config()
\ No newline at end of file
@@ -5,15 +5,29 @@ except ImportError:
     PYGAME_AVAILABLE = False
     print("Warning: pygame not available. Display functionality disabled.")
 
+import collections
+import numpy as np
+from Camera import Camera
 from Config import config
 
 class Display:
-    """Handles all pygame-specific display functionality."""
+    """Handles all pygame-specific display functionality.
+
+    The window is a camera view of a world that may be far larger than it
+    (world_width x world_height, the window size by default). Drag with the
+    mouse or hold the arrow keys to pan, use the wheel or +/- to zoom and
+    Home to zoom all the way out. Below settings.LOD_ZOOM blobs are drawn as a
+    density map instead of circles. settings is the run's RunConfig, a fresh
+    config snapshot by default.
+    """
     
-    def __init__(self, width, height):
+    def __init__(self, width, height, world_width=None, world_height=None, settings=None):
         if not PYGAME_AVAILABLE:
             raise ImportError("pygame is required for display functionality")
         
+        settings = config.snapshot() if settings is None else settings
+        self.background = tuple(settings.BACKGROUND_COLOR)
+        self.fps = settings.FPS
         pygame.init()
         self.width = width
         self.height = height
@@ -22,28 +36,167 @@ class Display:
         self.screen = pygame.display.set_mode((width, height))
         pygame.display.set_caption("SwirlyColors Simulation")
         self.clock = pygame.time.Clock()
+        
+        # Pre-rendered circle sprites keyed by (radius, quantized color), least recently used first
+        self.sprites = collections.OrderedDict()
+        self.sprite_cache_size = max(1, settings.SPRITE_CACHE_SIZE)
+        self.sprite_color_step = max(1, settings.SPRITE_COLOR_STEP)
+        
+        # View onto the (wrapping) world
+        self.camera = Camera(width if world_width is None else world_width,
+                             height if world_height is None else world_height, width, height)
+        self.lod_zoom = settings.LOD_ZOOM
+        self.splat_size = max(1, settings.SPLAT_SIZE)
+        self.pan_speed = settings.PAN_SPEED
+        self.dragging = False
     
     def clear(self):
         """Clear the screen with background color."""
-        self.screen.fill(config.BACKGROUND_COLOR)
+        self.screen.fill(self.background)
     
     def draw_blob(self, x, y, radius, color):
-        """Draw a single blob."""
+        """Draw a single blob (at world position x, y)."""
+        camera = self.camera
+        if not camera.is_identity:
+            sx, sy = camera.to_screen(x, y, radius)
+            radius = max(1, radius * camera.zoom)
+            if sx + radius < 0 or sx - radius >= self.width or sy + radius < 0 or sy - radius >= self.height:
+                return
+            x, y = sx, sy
         pygame.draw.circle(self.screen, color, (int(x), int(y)), int(radius))
     
-    def update(self):
-        """Update the display."""
+    def draw_blobs(self, x, y, radius, color, grid=None):
+        """Draw the blobs in view with one Surface.blits call, or as a density map when zoomed out.
+
+        Takes position and color columns (as from World/Population.columns())
+        and one radius per blob or a single radius for all of them. grid is
+        the world's SpatialHash; when it indexes these positions, only blobs
+        in cells around the view are looked at, so the cost follows what is
+        on screen rather than the population size.
+        """
+        camera = self.camera
+        if camera.is_identity:
+            self._blit_blobs(x, y, radius, color)
+            return
+        
+        x, y = np.asarray(x), np.asarray(y)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), x.shape)
+        color = np.asarray(color).reshape(-1, 3)
+        margin = float(radius.max()) if radius.size else 0.0
+        if grid is not None and grid.indexed == len(x) and (grid.width, grid.height) == (
+                camera.world_width, camera.world_height):
+            # Back in index order, so overlapping blobs stack as without the grid
+            near = np.sort(grid.query(*camera.visible_rect(margin)))
+            x, y, radius, color = x[near], y[near], radius[near], color[near]
+        
+        # Exact cull in window pixels (positions unwrapped across the seam)
+        sx, sy = camera.to_screen(x, y, margin)
+        radius = radius * camera.zoom
+        visible = (sx + radius >= 0) & (sx - radius < self.width) & (sy + radius >= 0) & (sy - radius < self.height)
+        sx, sy, radius, color = sx[visible], sy[visible], radius[visible], color[visible]
+        
+        if camera.zoom < self.lod_zoom:
+            self._draw_splats(sx, sy, radius, color)
+        else:
+            self._blit_blobs(sx, sy, np.maximum(1, radius.astype(np.int64)), color)
+    
+    def _draw_splats(self, sx, sy, radius, color):
+        """Draw blobs as splat_size pixel cells of their mean color, blended over the background by covered area."""
+        size = self.splat_size
+        cols, rows = -(-self.width // size), -(-self.height // size)
+        cell = (np.clip(sy // size, 0, rows - 1).astype(np.int64) * cols
+                + np.clip(sx // size, 0, cols - 1).astype(np.int64))
+        area = np.pi * radius * radius
+        covered = np.bincount(cell, weights=area, minlength=rows * cols)
+        mean = np.stack(
+            [np.bincount(cell, weights=area * color[:, c], minlength=rows * cols) for c in range(3)], axis=1
+        ) / np.maximum(covered, 1e-9)[:, None]
+        coverage = np.minimum(1.0, covered / (size * size))[:, None]
+        background = np.asarray(self.background, dtype=np.float64)
+        image = (background + (mean - background) * coverage).astype(np.uint8).reshape(rows, cols, 3)
+        surface = pygame.surfarray.make_surface(image.swapaxes(0, 1))
+        self.screen.blit(pygame.transform.scale(surface, (cols * size, rows * size)), (0, 0))
+    
+    def _blit_blobs(self, x, y, radius, color):
+        """Blit cached circle sprites at window positions x, y."""
+        x = np.asarray(x)
+        radius = np.broadcast_to(np.asarray(radius).astype(np.int64), x.shape)
+        quantized = np.asarray(color, dtype=np.int64).reshape(-1, 3) // self.sprite_color_step
+        keys = (radius << 24) | (quantized[:, 0] << 16) | (quantized[:, 1] << 8) | quantized[:, 2]
+        
+        # One cache lookup per distinct sprite rather than per blob
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        cache, sprites = self.sprites, []
+        for key in unique_keys.tolist():
+            sprite = cache.get(key)
+            if sprite is None:
+                sprite = self._add_sprite(key)
+            else:
+                cache.move_to_end(key)
+            sprites.append(sprite)
+        
+        left = (x.astype(np.int64) - radius).tolist()
+        top = (np.asarray(y).astype(np.int64) - radius).tolist()
+        self.screen.blits(list(zip(map(sprites.__getitem__, inverse.ravel().tolist()), zip(left, top))), doreturn=False)
+    
+    def _add_sprite(self, key):
+        """Render and cache the sprite for a (radius, quantized color) key, evicting the oldest if full."""
+        radius, step = key >> 24, self.sprite_color_step
+        # Draw each quantized color at the middle of its bucket
+        offset = step // 2 if step > 1 else 0
+        color = tuple(min(255, ((key >> shift) & 0xFF) * step + offset) for shift in (16, 8, 0))
+        sprite = self._render_sprite(radius, color)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.sprite_cache_size:
+            self.sprites.popitem(last=False)
+        return sprite
+    
+    def _render_sprite(self, radius, color):
+        """Pre-render one circle onto a color-keyed surface."""
+        sprite = pygame.Surface((max(1, 2 * radius), max(1, 2 * radius)))
+        # Any color other than the circle's works as the transparent key
+        key_color = (0, 0, 0) if tuple(color) != (0, 0, 0) else (255, 255, 255)
+        sprite.fill(key_color)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprite.set_colorkey(key_color, pygame.RLEACCEL)
+        return sprite.convert()
+    
+    def update(self, limit_fps=True):
+        """Update the display, waiting to hold the run's FPS unless limit_fps is False."""
         pygame.display.flip()
-        self.clock.tick(config.FPS)
+        if limit_fps:
+            self.clock.tick(self.fps)
     
     def handle_events(self):
-        """Handle pygame events. Returns False if should quit."""
+        """Handle pygame events and camera controls. Returns False if should quit."""
+        camera = self.camera
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return False
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    camera.zoom_at(1.25, self.width / 2, self.height / 2)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    camera.zoom_at(0.8, self.width / 2, self.height / 2)
+                elif event.key == pygame.K_HOME:
+                    camera.zoom_at(0.0, 0, 0)
+            elif event.type == pygame.MOUSEWHEEL:
+                camera.zoom_at(1.1 ** event.y, *pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                self.dragging = True
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                self.dragging = False
+            elif event.type == pygame.MOUSEMOTION and self.dragging:
+                camera.pan(-event.rel[0], -event.rel[1])
+        
+        # Held arrow keys pan smoothly
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * self.pan_speed
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * self.pan_speed
+        if dx or dy:
+            camera.pan(dx, dy)
         return True
     
     def close(self):
@@ -0,0 +1,182 @@
+# Offscreen rendering of frames to RGB arrays, encoded to PNG or raw video on a process pool
+import collections
+import multiprocessing
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Config import config
+
+class Rasterizer:
+    """Draws blobs into an (height, width, 3) uint8 RGB array the way Display draws them.
+
+    Circles cover the same pixels as Display.draw_blob (pygame's filled
+    circle at the truncated centre and radius), are clipped at the window
+    edges and use the exact blob colors over config.BACKGROUND_COLOR. Later
+    blobs of the same radius paint over earlier ones.
+    """
+
+    # Disk pixels stamped per batch, bounding the temporary index arrays
+    CHUNK_PIXELS = 1 << 22
+
+    def __init__(self, width, height, background=None):
+        self.width = width
+        self.height = height
+        self.background = np.array(config.BACKGROUND_COLOR if background is None else background, dtype=np.uint8)
+        self._disks = {}
+
+    def _disk(self, radius):
+        """Return the (dy, dx) pixel offsets pygame.draw.circle fills for the given radius."""
+        disk = self._disks.get(radius)
+        if disk is None:
+            # pygame's midpoint circle: horizontal spans mirrored over the octants
+            spans = []
+            f, ddf_x, ddf_y, x, y = 1 - radius, 0, -2 * radius, 0, radius
+            while x < y:
+                if f >= 0:
+                    y -= 1
+                    ddf_y += 2
+                    f += ddf_y
+                x += 1
+                ddf_x += 2
+                f += ddf_x + 1
+                if f >= 0:
+                    spans += [(y - 1, -x, x - 1), (-y, -x, x - 1)]
+                spans += [(x - 1, -y, y - 1), (-x, -y, y - 1)]
+            offsets = {(row, col) for row, first, last in spans for col in range(first, last + 1)}
+            dy, dx = np.array(sorted(offsets), dtype=np.int64).reshape(-1, 2).T
+            disk = self._disks[radius] = (dy, dx)
+        return disk
+
+    def render(self, x, y, radius, color, out=None):
+        """Return an RGB image of the blobs; pass out to reuse a buffer."""
+        image = np.empty((self.height, self.width, 3), dtype=np.uint8) if out is None else out
+        image[...] = self.background
+        pixels = image.reshape(-1, 3)
+
+        cx = np.asarray(x).astype(np.int64)
+        cy = np.asarray(y).astype(np.int64)
+        radius = np.broadcast_to(np.asarray(radius).astype(np.int64), cx.shape)
+        color = np.asarray(color).reshape(-1, 3).astype(np.uint8)
+
+        for r in np.unique(radius).tolist():
+            blobs = np.flatnonzero(radius == r)
+            dy, dx = self._disk(r)
+            chunk = max(1, self.CHUNK_PIXELS // dy.size)
+            for start in range(0, blobs.size, chunk):
+                part = blobs[start:start + chunk]
+                px = cx[part, None] + dx
+                py = cy[part, None] + dy
+                inside = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+                owner = np.broadcast_to(part[:, None], px.shape)[inside]
+                pixels[py[inside] * self.width + px[inside]] = color[owner]
+        return image
+
+def encode_png(image, level=6):
+    """Return the bytes of an 8-bit RGB PNG of an (height, width, 3) uint8 array."""
+    height, width, _ = image.shape
+    # Every scanline starts with filter type 0 (none)
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, -1)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), level)) + chunk(b"IEND", b""))
+
+class FrameExporter:
+    """FrameStream sink that renders frames offscreen and encodes them in worker processes.
+
+    format "png" writes directory/frame-NNNNNN.png per frame; "raw" appends
+    rgb24 frames to directory/frames.rgb (play it with
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -i frames.rgb). Only the blob
+    columns are sent to the workers. Frames in flight are capped so their
+    images fit in memory_budget bytes; when the cap is hit the simulation
+    waits for the oldest frame instead of growing the queue. Frames use the
+    background color of settings, the run's RunConfig (a fresh config
+    snapshot by default).
+    """
+
+    def __init__(self, directory, width, height, format="png", workers=None, memory_budget=256 << 20,
+                 compression=6, settings=None):
+        if format not in ("png", "raw"):
+            raise ValueError(f"Unknown export format {format!r} (expected 'png' or 'raw')")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = format
+        background = tuple((config.snapshot() if settings is None else settings).BACKGROUND_COLOR)
+        self.settings = (width, height, background, format, directory, compression)
+        self.max_in_flight = max(1, memory_budget // (width * height * 3))
+        # Forked workers would inherit the simulation's threads' locks (log writer, stream
+        # server) in whatever state the fork caught them; start them from a clean process
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=context)
+        self.pending = collections.deque()
+        self.stream = open(os.path.join(directory, "frames.rgb"), "wb") if format == "raw" else None
+
+        self.exported = 0
+        self.stalls = 0
+        self.started = None
+        self.seconds = 0.0
+
+    def __call__(self, frame):
+        if self.started is None:
+            self.started = time.perf_counter()
+        if len(self.pending) >= self.max_in_flight:
+            self.stalls += 1
+            self._finish_oldest()
+        # Copies of the columns; the live arrays keep changing while the worker renders
+        job = (frame.number, np.array(frame.x), np.array(frame.y), np.array(frame.radius), np.array(frame.color))
+        self.pending.append(self.pool.submit(_export_frame, self.settings, job))
+        # Collect whatever is already done so raw frames reach the file early
+        while self.pending and self.pending[0].done():
+            self._finish_oldest()
+
+    def _finish_oldest(self):
+        data = self.pending.popleft().result()
+        if self.stream is not None:
+            self.stream.write(data)
+        self.exported += 1
+
+    def close(self, frames=None):
+        """Wait for every frame in flight and stop the workers."""
+        while self.pending:
+            self._finish_oldest()
+        self.pool.shutdown()
+        if self.stream is not None:
+            self.stream.close()
+        if self.started is not None:
+            self.seconds = time.perf_counter() - self.started
+
+    def stats(self):
+        return {
+            "frames": self.exported,
+            "seconds": self.seconds,
+            "fps": self.exported / self.seconds if self.seconds > 0 else 0.0,
+            "stalls": self.stalls,
+            "max_in_flight": self.max_in_flight,
+        }
+
+# One rasterizer and image buffer per worker process, reused across frames
+_worker_rasterizer = None
+_worker_image = None
+
+def _export_frame(settings, job):
+    global _worker_rasterizer, _worker_image
+    width, height, background, format, directory, compression = settings
+    number, x, y, radius, color = job
+    if _worker_rasterizer is None or (_worker_rasterizer.width, _worker_rasterizer.height) != (width, height):
+        _worker_rasterizer = Rasterizer(width, height, background)
+        _worker_image = None
+    _worker_image = image = _worker_rasterizer.render(x, y, radius, color, out=_worker_image)
+    if format == "raw":
+        return image.tobytes()
+    with open(os.path.join(directory, f"frame-{number:06d}.png"), "wb") as f:
+        f.write(encode_png(image, compression))
+    return None
@@ -0,0 +1,119 @@
+# Library API: step a world tick by tick and stream read-only frames
+import collections
+from PhaseTimer import NULL_TIMER
+
+# One tick of blob state; number is the 0-based tick index, the arrays are read-only
+Frame = collections.namedtuple("Frame", "number x y vx vy radius color")
+
+def read_only(array):
+    """Return a read-only view of an array (no copy)."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+class FrameStream:
+    """Steps a World or Population and hands every tick to sinks and consumers.
+
+    Pull frames lazily with iter_frames(); every=k skips k-1 ticks between
+    yielded frames without building views for them. Sinks are callables
+    taking a Frame, attached with add_sink() and run in order after each tick
+    they are due on; a sink with a close(frames) method is closed by close().
+
+        world = simulation.create_world(1920, 1080, seed=1)
+        stream = FrameStream(world).add_sink(LogSink(TextLog(path, metadata)), every=60)
+        for frame in stream.iter_frames(1000, every=10):
+            analyse(frame.x, frame.y)
+        stream.close()
+    """
+
+    def __init__(self, world, timer=NULL_TIMER, start_frame=0):
+        self.world = world
+        self.timer = timer
+        self.frames = start_frame
+        self.sinks = []
+
+    def add_sink(self, sink, every=1, phase=None):
+        """Run sink(frame) on every tick whose number is a multiple of every, timed as phase if given."""
+        self.sinks.append((sink, max(1, every), phase))
+        return self
+
+    def view(self):
+        """Return the current state as a Frame of read-only arrays.
+
+        The numpy backends hand out views of the live arrays, valid until the
+        next tick; copy them to keep a frame around.
+        """
+        x, y, vx, vy, color = self.world.columns()
+        radius = self.world.radius
+        if hasattr(radius, "flags"):
+            radius = read_only(radius)
+        return Frame(self.frames - 1, read_only(x), read_only(y), read_only(vx), read_only(vy), radius, read_only(color))
+
+    def step(self):
+        """Advance one tick and run the sinks due on it; return the tick's number."""
+        begin_frame = getattr(self.timer, "begin_frame", None)
+        if begin_frame is not None:
+            begin_frame()
+        self.world.step(self.timer)
+        number = self.frames
+        self.frames += 1
+
+        frame = None
+        for sink, every, phase in self.sinks:
+            if number % every:
+                continue
+            if frame is None:
+                frame = self.view()
+            if phase is None:
+                sink(frame)
+            else:
+                with self.timer.phase(phase):
+                    sink(frame)
+
+        end_frame = getattr(self.timer, "end_frame", None)
+        if end_frame is not None:
+            end_frame(self.world)
+        return number
+
+    def iter_frames(self, n=None, every=1):
+        """Yield a Frame after every every-th of the next n ticks (forever if n is None)."""
+        ticks = 0
+        while n is None or ticks < n:
+            self.step()
+            ticks += 1
+            if ticks % every == 0:
+                yield self.view()
+
+    def close(self):
+        """Close every sink that has a close(frames) method."""
+        for sink, every, phase in self.sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close(self.frames)
+
+class LogSink:
+    """Sink appending frames to a TextLog, SnapshotWriter or AsyncLog."""
+
+    def __init__(self, log):
+        self.log = log
+
+    def __call__(self, frame):
+        self.log.append(frame.number, frame.x, frame.y, frame.vx, frame.vy, frame.color)
+        self.log.flush()
+
+    def close(self, frames):
+        self.log.close(total_frames=frames)
+
+class RenderSink:
+    """Sink drawing frames to a Display as fast as they come (no FPS limit)."""
+
+    def __init__(self, display):
+        self.display = display
+
+    def __call__(self, frame):
+        self.display.clear()
+        self.display.draw_blobs(frame.x, frame.y, frame.radius, frame.color)
+        self.display.update(limit_fps=False)
+
+    def close(self, frames):
+        self.display.close()
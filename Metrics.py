@@ -0,0 +1,77 @@
+# Per-frame instrumentation for the main simulation loop
+import json
+import time
+import numpy as np
+from PhaseTimer import PhaseTimer
+
+# Frame-time histogram bucket edges in milliseconds (the last bucket is open-ended)
+HISTOGRAM_EDGES_MS = (1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000)
+
+class Metrics(PhaseTimer):
+    """Phase timers, frame-time percentiles and per-frame counters for a run.
+
+    Pass it as the timer of World/Population.step() and wrap each frame in
+    begin_frame()/end_frame(). snapshot() returns everything as a dict and
+    export() appends that dict as one JSON line to a metrics file.
+    """
+
+    def __init__(self, window=1000):
+        super().__init__()
+        self.window = max(1, window)
+        self.frame_times = np.zeros(self.window)
+        self.histogram = np.zeros(len(HISTOGRAM_EDGES_MS) + 1, dtype=np.int64)
+        self.frames = 0
+        self.last_frame_counters = {}
+        self.memory_pairs = 0
+        self.flocks = None
+        self._frame_start = None
+        self._counters_at_frame_start = {}
+
+    def begin_frame(self):
+        self._counters_at_frame_start = dict(self.counters)
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self, world=None):
+        """Record the frame time and the per-frame counters of the frame just finished."""
+        frame_ms = 1000 * (time.perf_counter() - self._frame_start)
+        self.frame_times[self.frames % self.window] = frame_ms
+        self.histogram[np.searchsorted(HISTOGRAM_EDGES_MS, frame_ms, side="right")] += 1
+        self.frames += 1
+        self.last_frame_counters = {
+            name: total - self._counters_at_frame_start.get(name, 0) for name, total in self.counters.items()
+        }
+        if world is not None:
+            self.memory_pairs = world.memory_pairs
+            if world.settings.FLOCKS != "off":
+                self.flocks = world.flocks.summary()
+
+    def snapshot(self):
+        """Return the current metrics as a JSON-friendly dict."""
+        recent = self.frame_times[:min(self.frames, self.window)]
+        frames = max(self.frames, 1)
+        if recent.size:
+            p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+            frame_ms = {"mean": float(recent.mean()), "p50": float(p50), "p95": float(p95),
+                        "p99": float(p99), "max": float(recent.max())}
+        else:
+            frame_ms = {}
+        return {
+            "frames": self.frames,
+            "frame_ms": frame_ms,
+            "histogram": {
+                "edges_ms": list(HISTOGRAM_EDGES_MS),
+                "counts": self.histogram.tolist(),
+            },
+            "phases_ms": {name: 1000 * total / frames for name, total in self.totals.items()},
+            "counters": {
+                name: {"total": total, "per_frame": total / frames, "last_frame": self.last_frame_counters.get(name, 0)}
+                for name, total in self.counters.items()
+            },
+            "collision_memory_pairs": self.memory_pairs,
+            "flocks": self.flocks,
+        }
+
+    def export(self, path, frame):
+        """Append a snapshot, tagged with the simulation frame number, as one JSON line."""
+        with open(path, "a") as f:
+            f.write(json.dumps({"frame": frame, **self.snapshot()}) + "\n")
@@ -0,0 +1,223 @@
+# World backend that spreads each step over worker processes
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from Flocks import UnionFind
+from PhaseTimer import NULL_TIMER
+from SpatialHash import SpatialHash
+from World import World, move_blobs, resolve_contacts
+
+# Arrays kept in shared memory, where the workers map them
+SHARED_ARRAYS = ("x", "y", "vx", "vy", "radius", "color", "cell_col", "cell_row")
+
+class ParallelWorld(World):
+    """A World whose movement, contact finding and bounces run in worker processes.
+
+    Blob state lives in multiprocessing.shared_memory blocks that every worker
+    maps, so nothing but index arrays and results crosses process boundaries.
+
+    Moving splits the blobs into one slice per worker, which also bins the new
+    positions into grid cells. Contacts are found per tile: the broad-phase
+    grid is cut into vertical strips of whole cell columns, one per task, and
+    each tile also reads a one-column halo on both sides (across the wrap seam
+    for the first and last strip). A pair belongs
+    to the tile holding the lower-indexed blob, so every pair is found exactly
+    once. Tile membership is recomputed from the shared cell columns every
+    step, so blobs migrate between tiles as they move.
+
+    Bounces are resolved per group of pairs that share blobs (a connected
+    component of the contact graph). A group inside one strip goes to that
+    strip's worker; the few groups crossing a strip border are resolved in
+    this process meanwhile. Groups share no blobs, and every pair's random
+    draws and collision memory are taken in World's order beforehand, so a
+    ParallelWorld steps bit for bit like a World with the same seed. The
+    target search and collision memory stay in this process: the search only
+    probes a few blobs per searcher and memory is one sorted merge per step.
+    """
+
+    def __init__(self, num_blobs, radius, width, height, seed=None, workers=None, settings=None):
+        super().__init__(num_blobs, radius, width, height, seed=seed, settings=settings)
+        self.workers = workers or os.cpu_count()
+        self.pool = None
+        # Column bounds of the strips of the last find_contacts (None when it used one tile)
+        self.strips = None
+        # Set when move() left the grid cells of the new positions in cell_col/cell_row
+        self.cells_current = False
+        self._share()
+
+    @classmethod
+    def from_state(cls, state, width, height, rng_state, workers=None, settings=None):
+        world = super().from_state(state, width, height, rng_state, settings)
+        world.workers = workers or os.cpu_count()
+        world._share()
+        return world
+
+    def _share(self):
+        """Move the state arrays into shared memory and start workers that map them."""
+        self.close()
+        n = len(self)
+        self.cell_col = np.zeros(n, dtype=np.int64)
+        self.cell_row = np.zeros(n, dtype=np.int64)
+
+        segments, layout = [], {}
+        for name in SHARED_ARRAYS:
+            array = getattr(self, name)
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+            shared[...] = array
+            setattr(self, name, shared)
+            segments.append(segment)
+            layout[name] = (segment.name, array.shape, array.dtype.str)
+
+        # Workers start from a fresh server process rather than a fork of this one, whose
+        # other threads (log writer, stream server) may hold locks at the time of the fork
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_attach,
+                                        initargs=(layout,))
+        self._finalizer = weakref.finalize(self, _release, self.pool, segments)
+
+    def close(self):
+        """Stop the workers and free the shared memory; the world keeps working in this process."""
+        if self.pool is None:
+            return
+        for name in SHARED_ARRAYS:
+            setattr(self, name, np.array(getattr(self, name)))
+        self.pool = None
+        self._finalizer()
+
+    def move(self):
+        """Move all blobs and find their grid cells, one slice per worker, and decay collision memory."""
+        if self.pool is None or len(self) == 0:
+            return super().move()
+        grid = self.contact_grid()
+        params = (self.move_params(), (grid.cols, grid.rows, grid.cell_width, grid.cell_height))
+        bounds = np.linspace(0, len(self), self.workers + 1).astype(np.int64)
+        jobs = [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        list(self.pool.map(_move_slice, jobs, [params] * len(jobs)))
+        self.cells_current = True
+        self._decay_memory()
+
+    def find_contacts(self, timer=NULL_TIMER):
+        """Return index arrays (i, j), i < j, of overlapping blobs in loop order."""
+        self.strips = None
+        if self.pool is None or len(self) == 0:
+            return super().find_contacts(timer)
+        grid = self.contact_grid()
+        if not self.cells_current:
+            self.cell_col[:], self.cell_row[:] = grid.cells(self.x, self.y)
+        self.cells_current = False
+        grid.index_cells(self.cell_col, self.cell_row)
+
+        # Strips of at least three columns keep each tile's halos apart
+        tiles = min(self.workers, grid.cols // 3)
+        if tiles < 2:
+            jobs = [(0, grid.cols, 0)]
+        else:
+            self.strips = bounds = np.linspace(0, grid.cols, tiles + 1).astype(np.int64)
+            jobs = [(int(first), int(last - first), 1) for first, last in zip(bounds[:-1], bounds[1:])]
+        settings = (grid.cols, grid.rows, self.width, self.height)
+
+        keys, candidates = [], 0
+        for tile_keys, tile_candidates in self.pool.map(_tile_contacts, jobs, [settings] * len(jobs)):
+            keys.append(tile_keys)
+            candidates += tile_candidates
+        timer.count("collision_candidates", candidates)
+
+        keys = np.sort(np.concatenate(keys))
+        n = max(len(self), 1)
+        return keys // n, keys % n
+
+    def bounce(self, i, j, timer=NULL_TIMER):
+        """Resolve touching pairs (i, j) as World does, each strip's own groups of pairs in its worker."""
+        if self.pool is None or self.strips is None or len(i) == 0:
+            return super().bounce(i, j, timer)
+        strength, flip, intensity = self.bounce_inputs(i, j)
+        params = self.bounce_params()
+
+        # Group the pairs by connected component, over just the blobs in contact
+        strip_i = np.searchsorted(self.strips, self.cell_col[i], side="right") - 1
+        strip_j = np.searchsorted(self.strips, self.cell_col[j], side="right") - 1
+        blobs, ends = np.unique(np.concatenate((i, j)), return_inverse=True)
+        groups = UnionFind(blobs.size)
+        groups.union(ends[:len(i)], ends[len(i):])
+        group = groups.roots()[ends[:len(i)]]
+        crossing = np.zeros(blobs.size, dtype=bool)
+        crossing[group[strip_i != strip_j]] = True
+        local = ~crossing[group]
+
+        futures = []
+        for tile in range(len(self.strips) - 1):
+            pairs = np.flatnonzero(local & (strip_i == tile))
+            if pairs.size:
+                futures.append((pairs, self.pool.submit(
+                    _resolve_tile, i[pairs], j[pairs], strength[pairs], flip[pairs], intensity[pairs], params
+                )))
+
+        # Groups across strip borders, while the workers handle theirs
+        bounced = np.zeros(len(i), dtype=bool)
+        border = np.flatnonzero(~local)
+        bounced[border] = resolve_contacts(self.columns(), i[border], j[border], strength[border], flip[border],
+                                           intensity[border], params)
+        for pairs, future in futures:
+            bounced[pairs] = future.result()
+
+        timer.count("collisions", int(bounced.sum()))
+        self._store_collisions(i[bounced], j[bounced], intensity[bounced])
+
+# Worker side: views of the shared arrays, mapped once per worker process
+_shared = {}
+_segments = []
+
+def _attach(layout):
+    for name, (segment_name, shape, dtype) in layout.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _segments.append(segment)
+        _shared[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+def _release(pool, segments):
+    pool.shutdown()
+    for segment in segments:
+        segment.close()
+        segment.unlink()
+
+def _move_slice(job, params):
+    start, stop = job
+    move_params, (cols, rows, cell_width, cell_height) = params
+    x, y = _shared["x"][start:stop], _shared["y"][start:stop]
+    move_blobs(x, y, _shared["vx"][start:stop], _shared["vy"][start:stop], move_params)
+    # Grid cells as SpatialHash.cells computes them
+    _shared["cell_col"][start:stop] = (x // cell_width).astype(np.int64) % cols
+    _shared["cell_row"][start:stop] = (y // cell_height).astype(np.int64) % rows
+
+def _resolve_tile(i, j, strength, flip, intensity, params):
+    columns = (_shared["x"], _shared["y"], _shared["vx"], _shared["vy"], _shared["color"])
+    return resolve_contacts(columns, i, j, strength, flip, intensity, params)
+
+def _tile_contacts(job, settings):
+    """Return the sorted pair keys (i * n + j) of touching pairs owned by one tile and its candidate count."""
+    first_col, strip_cols, halo = job
+    cols, rows, width, height = settings
+    x, y, radius = _shared["x"], _shared["y"], _shared["radius"]
+    n = len(x)
+
+    # The strip plus its halo columns, laid out from 0 so the seam needs no special case
+    local_col = (_shared["cell_col"] - (first_col - halo)) % cols
+    members = np.flatnonzero(local_col < strip_cols + 2 * halo)
+    local_col = local_col[members]
+    i, j = SpatialHash.cell_pairs(local_col, _shared["cell_row"][members], strip_cols + 2 * halo, rows)
+
+    # Keep the pairs whose lower-indexed blob lies in the strip itself
+    owned = (local_col[i] >= halo) & (local_col[i] < halo + strip_cols)
+    i, j = members[i[owned]], members[j[owned]]
+
+    dx = x[i] - x[j]
+    dy = y[i] - y[j]
+    dx = dx - width * np.round(dx / width)
+    dy = dy - height * np.round(dy / height)
+    touching = np.hypot(dx, dy) < radius[i] + radius[j]
+    return i[touching].astype(np.int64) * max(n, 1) + j[touching], i.size
@@ -0,0 +1,52 @@
+# Wall-clock timing of the phases of a simulation step
+import contextlib
+import time
+
+class PhaseTimer:
+    """Accumulates exclusive wall time per named phase, plus named event counters.
+
+    Phases may nest; time spent in an inner phase is not counted again in
+    the phase around it.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+        self.counters = {}
+        self._stack = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            inner = self._stack.pop()
+            elapsed = time.perf_counter() - start
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed - inner
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def count(self, name, value=1):
+        """Add value to a named event counter (collisions, targeting hits, ...)."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        self.totals = {}
+        self.counts = {}
+        self.counters = {}
+
+class NullTimer:
+    """Stand-in used when timing is off; every phase is a shared no-op context."""
+
+    _context = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def count(self, name, value=1):
+        pass
+
+NULL_TIMER = NullTimer()
@@ -0,0 +1,164 @@
+# Population of Blob objects stepped one blob at a time
+import numpy as np
+from Blob import Arena, Blob
+from CollisionMemory import CollisionMemory
+from ColorIndex import ColorIndex
+from Config import config
+from Flocks import Flocks
+from PhaseTimer import NULL_TIMER
+from RandomStreams import RandomStreams
+from SpatialHash import SpatialHash
+
+class Population:
+    """The "objects" backend: a list of Blob instances sharing one Arena.
+
+    Offers the same step/rows/columns interface as the numpy World backend.
+    settings is the run's RunConfig, a fresh config snapshot by default.
+
+    Every random draw comes from RandomStreams seeded with seed: the initial
+    blobs are drawn in bulk exactly as World draws them, so both backends
+    start from the same state for a given seed, and each step pre-draws
+    every blob's search draws at once.
+    """
+
+    def __init__(self, num_blobs, radius, width, height, seed=None, settings=None):
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.settings = settings = config.snapshot() if settings is None else settings
+        self.streams = RandomStreams(seed)
+        self.rng = self.streams.rng
+        self.collision_memory = CollisionMemory(decay=settings.COLLISION_MEMORY_DECAY)
+        self.arena = Arena(width, height, self.collision_memory, settings)
+
+        x = self.rng.uniform(radius, width - radius, num_blobs).tolist()
+        y = self.rng.uniform(radius, height - radius, num_blobs).tolist()
+        vx = self.rng.uniform(-settings.NORMAL_SPEED, settings.NORMAL_SPEED, num_blobs).tolist()
+        vy = self.rng.uniform(-settings.NORMAL_SPEED, settings.NORMAL_SPEED, num_blobs).tolist()
+        color = self.rng.integers(
+            settings.MINIMUM_COLOR, settings.MAXIMUM_COLOR, size=(num_blobs, 3), endpoint=True
+        ).tolist()
+        self.blobs = [
+            Blob(radius, width, height, x=x[i], y=y[i], vx=vx[i], vy=vy[i], color=color[i], index=i, arena=self.arena)
+            for i in range(num_blobs)
+        ]
+        self.grid = SpatialHash(2 * radius, width, height)
+        self.color_index = ColorIndex(threshold=self.settings.FLOCK_COLOR_THRESHOLD)
+        self.flocks = Flocks()
+
+    def state(self):
+        """Return the complete population state as a dict of arrays (see Checkpoint)."""
+        x, y, vx, vy, color = self.columns()
+        pairs, values = self.collision_memory.live_entries()
+        return {
+            "x": x, "y": y, "vx": vx, "vy": vy, "color": color.astype(np.uint8),
+            "memory_pairs": pairs, "memory_values": values,
+        }
+
+    @classmethod
+    def from_state(cls, state, radius, width, height, rng_state=None, settings=None):
+        """Rebuild a population from state() arrays and its generator's bit_generator.state."""
+        population = cls(len(state["x"]), radius, width, height, settings=settings)
+        columns = zip(state["x"].tolist(), state["y"].tolist(), state["vx"].tolist(),
+                      state["vy"].tolist(), state["color"].tolist())
+        for blob, (x, y, vx, vy, color) in zip(population.blobs, columns):
+            blob.x, blob.y, blob.vx, blob.vy, blob.color = x, y, vx, vy, color
+        population.collision_memory.load(state["memory_pairs"], state["memory_values"])
+        if rng_state is not None:
+            population.rng.bit_generator.state = rng_state
+        return population
+
+    def __len__(self):
+        return len(self.blobs)
+
+    def rows(self):
+        """Yield (x, y, vx, vy, radius, color) for every blob."""
+        return ((blob.x, blob.y, blob.vx, blob.vy, blob.radius, blob.rgb) for blob in self.blobs)
+
+    def columns(self):
+        """Return (x, y, vx, vy, color) arrays holding a copy of every blob's state."""
+        blobs, count = self.blobs, len(self.blobs)
+        return (
+            np.fromiter((blob.x for blob in blobs), dtype=np.float64, count=count),
+            np.fromiter((blob.y for blob in blobs), dtype=np.float64, count=count),
+            np.fromiter((blob.vx for blob in blobs), dtype=np.float64, count=count),
+            np.fromiter((blob.vy for blob in blobs), dtype=np.float64, count=count),
+            np.array([blob.rgb for blob in blobs], dtype=np.int32).reshape(count, 3),
+        )
+
+    def step(self, timer=NULL_TIMER):
+        """Advance the simulation by one frame."""
+        with timer.phase("search"):
+            self.search_for_targets(timer)
+        with timer.phase("move"):
+            self.move()
+        with timer.phase("collisions"):
+            i, j = self.collide(timer)
+        if self.settings.FLOCKS != "off":
+            with timer.phase("flocks"):
+                self.update_flocks(i, j, timer)
+
+    @property
+    def memory_pairs(self):
+        """Number of live entries in the collision memory."""
+        return len(self.collision_memory)
+
+    def search_for_targets(self, timer=NULL_TIMER):
+        # Decide every blob's search at once; only the searchers visit the index
+        searchers, rows = self.streams.begin_frame(len(self.blobs), self.settings.TARGET_SEARCH_CHANCE)
+        hits = 0
+        if searchers:
+            # Colors only change during collisions, so index them once per frame
+            self.color_index.rebuild(self.blobs)
+        for index, draws in zip(searchers, rows):
+            if self.blobs[index].search_for_target(self.blobs, self.color_index, draws):
+                hits += 1
+        timer.count("target_hits", hits)
+
+    def move(self):
+        for blob in self.blobs:
+            blob.move()
+
+        # Blobs that keep colliding bounce off each other more strongly
+        # Decay lets them bounce normally again after some time
+        self.collision_memory.decay()
+
+    def collide(self, timer=NULL_TIMER):
+        """Check collisions between blobs in neighbouring grid cells and bounce them.
+
+        Returns the touching pairs (i, j), bounced or not, for the flocks.
+        """
+        candidates = collisions = 0
+        touching = []
+        for blob1, blob2 in self.grid.blob_pairs(self.blobs):
+            candidates += 1
+            if not blob1.touches(blob2):
+                continue
+            touching.append((blob1.index, blob2.index))
+            if not blob1.is_preferential_match(blob2):
+                collisions += 1
+                with timer.phase("bounce"):
+                    blob1.bounce_off(blob2, self.streams.pair)
+        timer.count("collision_candidates", candidates)
+        timer.count("collisions", collisions)
+        pairs = np.array(touching, dtype=np.int64).reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def update_flocks(self, i, j, timer=NULL_TIMER):
+        """Rebuild the flocks from touching pairs (i, j) and, when aligning, move each flock as one."""
+        blobs = self.blobs
+        # Bounces may have changed colors since collide(), so match them now
+        matched = np.fromiter((blobs[a].is_preferential_match(blobs[b]) for a, b in zip(i.tolist(), j.tolist())),
+                              dtype=bool, count=i.size)
+        i, j = i[matched], j[matched]
+        self.flocks.update(len(blobs), i, j)
+        timer.count("flocks", self.flocks.count)
+        if self.settings.FLOCKS == "align":
+            vx, vy = self.columns()[2:4]
+            self.flocks.align(vx, vy)
+            for index in np.flatnonzero(self.flocks.flocking()).tolist():
+                blob = self.blobs[index]
+                blob.vx, blob.vy = float(vx[index]), float(vy[index])
+            # Flock mates move together, so their bounce history no longer applies
+            for a, b in zip(i.tolist(), j.tolist()):
+                self.collision_memory.forget(a, b)
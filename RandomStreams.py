@@ -0,0 +1,51 @@
+# Seeded random draws for the objects backend, made in bulk from a NumPy Generator
+import numpy as np
+
+def fresh_seed():
+    """Return a new 32-bit seed for a run started without one (record it to reproduce the run)."""
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+class RandomStreams:
+    """Uniform [0, 1) draws for one population, taken in blocks from one seeded Generator.
+
+    begin_frame() draws every blob's search chance as one vector, indexed by
+    blob index, then one row of draws per searching blob, so what a blob
+    draws depends only on the seed, the frame and its index, never on the
+    order blobs are visited in. Bounces draw from the pair stream, refilled
+    PAIR_BLOCK values at a time, in collision order. Unused pair draws are
+    dropped when the next frame begins, so between frames the generator
+    state alone describes the streams (that is what checkpoints store).
+    """
+
+    # The search chance, then ColorIndex probes, then the fallback pick
+    DRAWS_PER_SEARCH = 8
+    PAIR_BLOCK = 1024
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.pair_draws = []
+        self.pair_next = 0
+
+    def begin_frame(self, n, search_chance):
+        """Draw this frame's searches among n blobs and drop the previous frame's leftover pair draws.
+
+        Returns (searchers, rows): the indices of the blobs that search this
+        frame in ascending order, and for each a list of DRAWS_PER_SEARCH
+        draws whose first entry is its search chance draw.
+        """
+        chance = self.rng.random(n)
+        searchers = np.flatnonzero(chance <= search_chance)
+        rows = self.rng.random((searchers.size, self.DRAWS_PER_SEARCH))
+        rows[:, 0] = chance[searchers]
+        self.pair_draws = []
+        self.pair_next = 0
+        return searchers.tolist(), rows.tolist()
+
+    def pair(self):
+        """Return the next draw of the pair stream."""
+        if self.pair_next == len(self.pair_draws):
+            self.pair_draws = self.rng.random(self.PAIR_BLOCK).tolist()
+            self.pair_next = 0
+        value = self.pair_draws[self.pair_next]
+        self.pair_next += 1
+        return value
@@ -0,0 +1,97 @@
+# Fixed-timestep scheduling of simulation ticks and rendered frames
+import time
+
+class Scheduler:
+    """Decides how many simulation ticks to run and whether to render on each loop pass.
+
+    With no tick rate the scheduler is "locked": one tick and one render per
+    pass, as in the classic loop. With a tick rate the simulation advances on
+    a fixed clock, running several ticks per pass to catch up if needed, and
+    renders happen at their own rate. A render that is due while the
+    simulation is behind is dropped instead, so drawing never slows the
+    ticks down.
+    """
+
+    def __init__(self, tick_rate=None, render_rate=None, max_catchup_ticks=5, max_dropped_renders=10):
+        self.tick_interval = 1.0 / tick_rate if tick_rate else None
+        self.render_interval = 1.0 / render_rate if render_rate else 0.0
+        self.max_catchup_ticks = max(1, max_catchup_ticks)
+        self.max_dropped_renders = max_dropped_renders
+
+        now = time.perf_counter()
+        self.next_tick = now
+        self.next_render = now
+        self.ticks = 0
+        self.renders = 0
+        self.dropped_renders = 0
+        self.skipped_ticks = 0
+        self._dropped_in_a_row = 0
+
+    @property
+    def locked(self):
+        return self.tick_interval is None
+
+    def ticks_due(self, limit=None):
+        """Return how many simulation ticks to run now, at most limit.
+
+        Only the returned ticks are counted and taken off the clock, so a
+        run that stops at its frame limit reports the ticks it actually ran.
+        """
+        if self.locked:
+            due = 1 if limit is None else min(1, limit)
+            self.ticks += due
+            return due
+
+        now = time.perf_counter()
+        if now < self.next_tick:
+            return 0
+        due = int((now - self.next_tick) / self.tick_interval) + 1
+        if due > self.max_catchup_ticks:
+            # Too far behind to ever catch up: give up the backlog rather than stall
+            self.skipped_ticks += due - self.max_catchup_ticks
+            self.next_tick += (due - self.max_catchup_ticks) * self.tick_interval
+            due = self.max_catchup_ticks
+        if limit is not None:
+            due = min(due, limit)
+        self.next_tick += due * self.tick_interval
+        self.ticks += due
+        return due
+
+    def render_due(self):
+        """Return True if a frame should be rendered now."""
+        if self.locked:
+            self.renders += 1
+            return True
+
+        now = time.perf_counter()
+        if now < self.next_render:
+            return False
+        self.next_render = max(self.next_render + self.render_interval, now)
+
+        # Drop the frame while ticks are overdue, but never freeze the picture for long
+        behind = now - self.next_tick >= self.tick_interval
+        if behind and self._dropped_in_a_row < self.max_dropped_renders:
+            self.dropped_renders += 1
+            self._dropped_in_a_row += 1
+            return False
+        self._dropped_in_a_row = 0
+        self.renders += 1
+        return True
+
+    def wait(self, rendering=True):
+        """Sleep until the next tick or render is due (no-op when locked)."""
+        if self.locked:
+            return
+        deadline = min(self.next_tick, self.next_render) if rendering else self.next_tick
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "renders": self.renders,
+            "ticks_per_render": self.ticks / self.renders if self.renders else None,
+            "dropped_renders": self.dropped_renders,
+            "skipped_ticks": self.skipped_ticks,
+        }
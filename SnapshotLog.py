@@ -0,0 +1,144 @@
+# Binary columnar snapshot log and its memory-mapped reader
+import json
+import struct
+import numpy as np
+
+MAGIC = b"SWIRLLOG"
+INDEX_MAGIC = b"SWIRLIDX"
+VERSION = 1
+
+# magic, version, blob count, header length (including padding)
+HEADER_STRUCT = struct.Struct("<8sIIQ")
+# magic, index offset, logged frame count, total simulated frames
+TRAILER_STRUCT = struct.Struct("<8sQQQ")
+ALIGNMENT = 64
+
+def frame_dtype(num_blobs):
+    """Return the fixed-width record layout of one logged frame."""
+    fields = [
+        ("frame", "<i8"),
+        ("x", "<f8", (num_blobs,)),
+        ("y", "<f8", (num_blobs,)),
+        ("vx", "<f8", (num_blobs,)),
+        ("vy", "<f8", (num_blobs,)),
+        ("color", "u1", (num_blobs, 3)),
+    ]
+    # Aligned layout pads each record to 8 bytes so every frame's float columns stay aligned
+    return np.dtype(fields, align=True)
+
+class SnapshotWriter:
+    """Appends fixed-width binary frames of blob state to a log file.
+
+    Layout: a header (magic, version, blob count, JSON metadata), then one
+    record per logged frame holding the frame number followed by the x, y,
+    vx, vy and color columns. Closing the writer appends a frame-number to
+    file-offset index and a trailer pointing at it.
+    """
+
+    def __init__(self, path, num_blobs, metadata=None):
+        self.path = path
+        self.num_blobs = num_blobs
+        self.dtype = frame_dtype(num_blobs)
+        self.frame_numbers = []
+        self.offsets = []
+
+        meta = json.dumps(metadata or {}).encode("utf-8")
+        header_length = -(-(HEADER_STRUCT.size + len(meta)) // ALIGNMENT) * ALIGNMENT
+        self.file = open(path, "wb")
+        self.file.write(HEADER_STRUCT.pack(MAGIC, VERSION, num_blobs, header_length))
+        self.file.write(meta.ljust(header_length - HEADER_STRUCT.size, b" "))
+        self.position = header_length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def append(self, frame, x, y, vx, vy, color):
+        """Write one frame of state; every column holds one entry per blob."""
+        record = np.zeros(1, dtype=self.dtype)
+        record["frame"] = frame
+        record["x"] = x
+        record["y"] = y
+        record["vx"] = vx
+        record["vy"] = vy
+        record["color"] = color
+        self.file.write(record.tobytes())
+        self.frame_numbers.append(frame)
+        self.offsets.append(self.position)
+        self.position += self.dtype.itemsize
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self, total_frames=None):
+        """Write the frame index and trailer, then close the file."""
+        if self.file.closed:
+            return
+        if total_frames is None:
+            total_frames = self.frame_numbers[-1] + 1 if self.frame_numbers else 0
+        index_offset = self.position
+        self.file.write(np.asarray(self.frame_numbers, dtype="<i8").tobytes())
+        self.file.write(np.asarray(self.offsets, dtype="<i8").tobytes())
+        self.file.write(TRAILER_STRUCT.pack(INDEX_MAGIC, index_offset, len(self.frame_numbers), total_frames))
+        self.file.close()
+
+class SnapshotReader:
+    """Memory-maps a snapshot log and serves frames as zero-copy NumPy views.
+
+    reader[k] returns one frame record and reader[a:b] a record array of
+    frames; fields such as reader[a:b]["x"] are (frames, blobs) views into
+    the file. Logs cut short without an index are still readable.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, num_blobs, header_length = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a snapshot log")
+            if version != VERSION:
+                raise ValueError(f"Unsupported snapshot log version {version}")
+            self.metadata = json.loads(f.read(header_length - HEADER_STRUCT.size).decode("utf-8").strip() or "{}")
+
+        self.num_blobs = num_blobs
+        self.dtype = frame_dtype(num_blobs)
+        self._raw = np.memmap(path, dtype=np.uint8, mode="r")
+
+        # Use the index written on close, or count whole frames if the run was cut short
+        magic, index_offset, count, total_frames = TRAILER_STRUCT.unpack(bytes(self._raw[-TRAILER_STRUCT.size:]))
+        self.total_frames = total_frames if magic == INDEX_MAGIC else None
+        if magic == INDEX_MAGIC:
+            index = self._raw[index_offset:index_offset + 16 * count].view("<i8")
+            self.frame_numbers, self.offsets = index[:count], index[count:]
+        else:
+            count = (self._raw.size - header_length) // self.dtype.itemsize
+
+        self.records = self._raw[header_length:header_length + count * self.dtype.itemsize].view(self.dtype)
+        if magic != INDEX_MAGIC:
+            self.frame_numbers = self.records["frame"]
+            self.offsets = header_length + np.arange(count, dtype=np.int64) * self.dtype.itemsize
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def find(self, frame):
+        """Return the position of a simulation frame number in the log."""
+        position = int(np.searchsorted(self.frame_numbers, frame))
+        if position >= len(self.frame_numbers) or self.frame_numbers[position] != frame:
+            raise KeyError(f"Frame {frame} was not logged")
+        return position
+
+    def frame(self, frame):
+        """Return the record logged for a simulation frame number."""
+        return self.records[self.find(frame)]
+
+    def frames(self, start, stop):
+        """Return records for logged frame numbers in [start, stop)."""
+        first = int(np.searchsorted(self.frame_numbers, start))
+        last = int(np.searchsorted(self.frame_numbers, stop))
+        return self.records[first:last]
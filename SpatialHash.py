@@ -0,0 +1,125 @@
+# Uniform grid broad phase for collision detection on a torus
+import numpy as np
+
+class SpatialHash:
+    """Buckets blobs into a wrapping grid so only neighbouring cells are paired up."""
+
+    # Smaller cells only add empty buckets (and zero-radius blobs would ask for infinitely many)
+    MIN_CELL_SIZE = 1.0
+
+    def __init__(self, cell_size, width, height):
+        self.width = width
+        self.height = height
+
+        # Whole number of cells per axis, each at least cell_size wide, so the grid tiles the torus
+        cell_size = max(cell_size, self.MIN_CELL_SIZE)
+        self.cols = max(1, int(width // cell_size))
+        self.rows = max(1, int(height // cell_size))
+        self.cell_width = width / self.cols
+        self.cell_height = height / self.rows
+        self.cell_size = min(self.cell_width, self.cell_height)
+
+        # Cells of the positions last paired or indexed, sorted into runs on first query
+        self.indexed = 0
+        self._cells = None
+        self._runs = None
+
+    def cells(self, x, y):
+        """Return the (column, row) grid cell of every position."""
+        col = (np.asarray(x) // self.cell_width).astype(np.int64) % self.cols
+        row = (np.asarray(y) // self.cell_height).astype(np.int64) % self.rows
+        return col, row
+
+    def candidate_pairs(self, x, y):
+        """Return index arrays (i, j), i < j, of blobs in the same or adjacent cells.
+
+        Pairs come back sorted the same way as the nested brute-force loop.
+        """
+        col, row = self.cells(x, y)
+        self.index_cells(col, row)
+        return self.cell_pairs(col, row, self.cols, self.rows, self.runs())
+
+    def index_cells(self, col, row):
+        """Remember the cells of the current positions for query()."""
+        self.indexed = len(col)
+        self._cells = (col, row)
+        self._runs = None
+
+    def runs(self):
+        """Return (order, cell_start, cell_end) of the indexed cells (see cell_runs)."""
+        if self._runs is None:
+            col, row = self._cells
+            self._runs = self.cell_runs(row * self.cols + col, self.cols * self.rows)
+        return self._runs
+
+    @staticmethod
+    def cell_runs(cell, num_cells):
+        """Return blob indices sorted by cell and the start/end of each cell's run in that order."""
+        order = np.argsort(cell, kind="stable")
+        bounds = np.searchsorted(cell[order], np.arange(num_cells + 1))
+        return order, bounds[:-1], bounds[1:]
+
+    def query(self, left, top, width, height):
+        """Return the indices of indexed blobs in cells overlapping a rectangle that may cross the seams.
+
+        The result is a superset of the blobs inside the rectangle; filter it
+        exactly if needed. Costs time in proportion to the cells and blobs
+        covered, not to the whole population.
+        """
+        order, cell_start, cell_end = self.runs()
+        cols = self._span(left, width, self.cell_width, self.cols)
+        rows = self._span(top, height, self.cell_height, self.rows)
+        cells = (rows[:, None] * self.cols + cols[None, :]).ravel()
+        start, count = cell_start[cells], cell_end[cells] - cell_start[cells]
+        offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        return order[np.repeat(start, count) + offset]
+
+    @staticmethod
+    def _span(start, length, cell_length, cells):
+        """Return the wrapped cell numbers covering [start, start + length) along one axis."""
+        first = int(np.floor(start / cell_length))
+        last = int(np.floor((start + length) / cell_length))
+        if last - first + 1 >= cells:
+            return np.arange(cells)
+        return np.arange(first, last + 1) % cells
+
+    @staticmethod
+    def cell_pairs(col, row, cols, rows, runs=None):
+        """Return sorted index arrays (i, j), i < j, of blobs in adjacent cells of a wrapping cols x rows grid.
+
+        runs is the grid's cell_runs() result if already known.
+        """
+        n = len(col)
+
+        # Blob indices grouped by cell, with the start/end of each cell's run
+        order, cell_start, cell_end = SpatialHash.cell_runs(row * cols + col, cols * rows) if runs is None else runs
+
+        found_i, found_j = [], []
+        for dc in (-1, 0, 1):
+            for dr in (-1, 0, 1):
+                neighbour = ((row + dr) % rows) * cols + (col + dc) % cols
+                start, count = cell_start[neighbour], cell_end[neighbour] - cell_start[neighbour]
+
+                # Expand every blob against each member of its neighbouring cell
+                i = np.repeat(np.arange(n), count)
+                offset = np.arange(i.size) - np.repeat(np.cumsum(count) - count, count)
+                j = order[np.repeat(start, count) + offset]
+                keep = i < j
+                found_i.append(i[keep])
+                found_j.append(j[keep])
+
+        keys = np.concatenate(found_i).astype(np.int64) * max(n, 1) + np.concatenate(found_j)
+        # Narrow grids (fewer than three cells across) reach the same cell twice through the wrap
+        if cols < 3 or rows < 3:
+            keys = np.unique(keys)
+        else:
+            keys.sort()
+        return keys // max(n, 1), keys % max(n, 1)
+
+    def blob_pairs(self, blobs):
+        """Yield (blob1, blob2) candidate pairs of Blob objects in brute-force loop order."""
+        x = np.fromiter((blob.x for blob in blobs), dtype=np.float64, count=len(blobs))
+        y = np.fromiter((blob.y for blob in blobs), dtype=np.float64, count=len(blobs))
+        i, j = self.candidate_pairs(x, y)
+        for a, b in zip(i.tolist(), j.tolist()):
+            yield blobs[a], blobs[b]
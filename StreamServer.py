@@ -0,0 +1,285 @@
+# Serve blob state to TCP clients: a keyframe, then quantized deltas of the blobs that changed
+import asyncio
+import json
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+PROTOCOL_VERSION = 1
+
+# Every server message: payload length, kind, frame number
+MESSAGE = struct.Struct("<IBI")
+HELLO, KEYFRAME, DELTA = 0, 1, 2
+COUNT = struct.Struct("<I")
+
+# Positions are sent as uint16 fractions of the world size, radii in 1/16 units
+POSITION_SCALE = 1 << 16
+RADIUS_SCALE = 16
+
+# Fast zlib level for the array block of every frame message
+COMPRESSION = 1
+
+def quantize(x, y, radius, color, width, height):
+    """Return (x, y, radius, color) as the uint16/uint8 arrays the protocol sends."""
+    n = len(x)
+    qx = (np.round(np.asarray(x) / width * POSITION_SCALE).astype(np.int64) % POSITION_SCALE).astype(np.uint16)
+    qy = (np.round(np.asarray(y) / height * POSITION_SCALE).astype(np.int64) % POSITION_SCALE).astype(np.uint16)
+    qradius = np.broadcast_to(np.round(np.asarray(radius) * RADIUS_SCALE), (n,)).astype(np.uint16)
+    qcolor = np.asarray(color).reshape(n, 3).astype(np.uint8)
+    return qx, qy, qradius, qcolor
+
+def encode_message(kind, number, payload):
+    return MESSAGE.pack(len(payload), kind, number) + payload
+
+def encode_keyframe(number, qx, qy, qradius, qcolor):
+    arrays = qx.tobytes() + qy.tobytes() + qradius.tobytes() + qcolor.tobytes()
+    return encode_message(KEYFRAME, number, COUNT.pack(len(qx)) + zlib.compress(arrays, COMPRESSION))
+
+def encode_delta(number, index, dx, dy, dcolor):
+    """Encode changed blobs as index gaps and wrapping differences from the previous state."""
+    gaps = np.diff(index, prepend=-1).astype(np.uint32)
+    arrays = gaps.tobytes() + dx.tobytes() + dy.tobytes() + dcolor.tobytes()
+    return encode_message(DELTA, number, COUNT.pack(len(index)) + zlib.compress(arrays, COMPRESSION))
+
+class StreamState:
+    """Client-side blob state rebuilt from server messages.
+
+    Feed every message to apply(); x, y, radius and color then hold the
+    latest frame in world units (color as an (n, 3) uint8 array).
+    """
+
+    def __init__(self):
+        self.width = self.height = None
+        self.frame = None
+        self.qx = self.qy = self.qradius = self.qcolor = None
+
+    def apply(self, kind, number, payload):
+        """Apply one message; return False for a kind this client does not know."""
+        if kind == HELLO:
+            hello = json.loads(payload)
+            if hello.get("version") != PROTOCOL_VERSION:
+                raise ValueError(f"Unsupported stream protocol version {hello.get('version')}")
+            self.width, self.height = hello["width"], hello["height"]
+            return True
+        if kind not in (KEYFRAME, DELTA):
+            return False
+        (count,) = COUNT.unpack_from(payload)
+        arrays = np.frombuffer(zlib.decompress(payload[COUNT.size:]), dtype=np.uint8)
+        if kind == KEYFRAME:
+            self.qx = arrays[:2 * count].view(np.uint16).copy()
+            self.qy = arrays[2 * count:4 * count].view(np.uint16).copy()
+            self.qradius = arrays[4 * count:6 * count].view(np.uint16).copy()
+            self.qcolor = arrays[6 * count:9 * count].reshape(count, 3).copy()
+        else:
+            # Differences wrap around, like positions on the torus
+            index = np.cumsum(arrays[:4 * count].view(np.uint32).astype(np.int64)) - 1
+            self.qx[index] += arrays[4 * count:6 * count].view(np.uint16)
+            self.qy[index] += arrays[6 * count:8 * count].view(np.uint16)
+            self.qcolor[index] += arrays[8 * count:11 * count].reshape(count, 3)
+        self.frame = number
+        return True
+
+    @property
+    def ready(self):
+        return self.qx is not None
+
+    @property
+    def x(self):
+        return self.qx * (self.width / POSITION_SCALE)
+
+    @property
+    def y(self):
+        return self.qy * (self.height / POSITION_SCALE)
+
+    @property
+    def radius(self):
+        return self.qradius / RADIUS_SCALE
+
+    @property
+    def color(self):
+        return self.qcolor
+
+async def read_message(reader):
+    """Read one server message from an asyncio StreamReader; return (kind, number, payload)."""
+    length, kind, number = MESSAGE.unpack(await reader.readexactly(MESSAGE.size))
+    return kind, number, await reader.readexactly(length)
+
+class _Client:
+    """One connection's send state: its rate limit and the frame it last received."""
+
+    def __init__(self, max_fps):
+        self.interval = 1.0 / max_fps
+        self.wake = asyncio.Event()
+        self.next_send = 0.0
+        self.sent = 0
+        self.base = None
+
+class StreamServer:
+    """FrameStream sink serving frames to any number of TCP clients.
+
+    The server runs an asyncio loop on its own thread. The simulation only
+    quantizes a frame (at most max_fps times a second, and only while
+    clients are connected) and hands it to the loop, so it never waits on a
+    socket. Each client task sends the newest frame when its own rate limit
+    allows: a full keyframe first and every keyframe_interval messages, and
+    otherwise a delta of just the blobs whose quantized position or color
+    differs from what that client last received. A slow client's task waits
+    on its own socket and then skips straight to the newest frame, so frames
+    never queue up for it.
+
+    Protocol (little endian): the client sends one JSON line, e.g.
+    {"max_fps": 20} or {}. The server then sends messages of MESSAGE header
+    (payload length, kind, frame number) plus payload:
+
+        HELLO     JSON {"version", "width", "height"}
+        KEYFRAME  uint32 n, zlib(x uint16[n], y uint16[n], radius uint16[n], color uint8[n, 3])
+        DELTA     uint32 k, zlib(gap uint32[k], dx uint16[k], dy uint16[k], dcolor uint8[k, 3])
+
+    x and y are fractions of the world size times POSITION_SCALE, radius is
+    in 1/RADIUS_SCALE units. A delta lists the k changed blobs by the gaps
+    between their indices (the first gap is index + 1) with differences from
+    the client's previous values, wrapping modulo 2**16 or 2**8.
+    StreamState decodes them.
+    """
+
+    HANDSHAKE_TIMEOUT = 5.0
+
+    def __init__(self, width, height, host="127.0.0.1", port=0, max_fps=30, keyframe_interval=300,
+                 max_clients=16, write_buffer=1 << 20):
+        self.width = width
+        self.height = height
+        self.max_fps = max_fps
+        self.keyframe_interval = keyframe_interval
+        self.max_clients = max_clients
+        self.write_buffer = write_buffer
+        self.clients = set()
+        self.tasks = set()
+        self.latest = None
+        self.last_publish = None
+
+        self.published = 0
+        self.served = 0
+        self.keyframes = 0
+        self.deltas = 0
+        self.bytes_sent = 0
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="StreamServer", daemon=True)
+        self.thread.start()
+        try:
+            self.server = asyncio.run_coroutine_threadsafe(
+                asyncio.start_server(self._serve_client, host, port), self.loop
+            ).result()
+        except BaseException:
+            self._stop_loop()
+            raise
+        self.host, self.port = self.server.sockets[0].getsockname()[:2]
+
+    def __call__(self, frame):
+        # Skip the quantizing work when nobody is watching or the last frame is too recent
+        if not self.clients:
+            return
+        now = time.perf_counter()
+        if self.last_publish is not None and now - self.last_publish < 1.0 / self.max_fps:
+            return
+        self.last_publish = now
+        quantized = quantize(frame.x, frame.y, frame.radius, frame.color, self.width, self.height)
+        self.loop.call_soon_threadsafe(self._publish, (frame.number, *quantized))
+
+    def _publish(self, frame):
+        self.latest = frame
+        self.published += 1
+        for client in self.clients:
+            client.wake.set()
+
+    async def _serve_client(self, reader, writer):
+        client = None
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            request = json.loads(await asyncio.wait_for(reader.readline(), self.HANDSHAKE_TIMEOUT) or b"{}")
+            if len(self.clients) >= self.max_clients:
+                return
+            max_fps = min(self.max_fps, float(request.get("max_fps") or self.max_fps))
+            client = _Client(max(max_fps, 1e-3))
+            writer.transport.set_write_buffer_limits(high=self.write_buffer)
+            hello = {"version": PROTOCOL_VERSION, "width": self.width, "height": self.height}
+            writer.write(encode_message(HELLO, 0, json.dumps(hello).encode()))
+            self.clients.add(client)
+            self.served += 1
+            if self.latest is not None:
+                client.wake.set()
+
+            while True:
+                await client.wake.wait()
+                client.wake.clear()
+                delay = client.next_send - self.loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                message = self._encode_for(client, self.latest)
+                writer.write(message)
+                self.bytes_sent += len(message)
+                client.next_send = self.loop.time() + client.interval
+                # Only this client's task waits for its socket to drain
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown; end quietly instead of leaving a cancelled connection task behind
+            pass
+        finally:
+            self.clients.discard(client)
+            self.tasks.discard(task)
+            writer.close()
+
+    def _encode_for(self, client, frame):
+        number, qx, qy, qradius, qcolor = frame
+        base = client.base
+        keyframe = (base is None or len(base[0]) != len(qx) or not np.array_equal(base[2], qradius)
+                    or (self.keyframe_interval > 0 and client.sent % self.keyframe_interval == 0))
+        client.base = (qx, qy, qradius, qcolor)
+        client.sent += 1
+        if keyframe:
+            self.keyframes += 1
+            return encode_keyframe(number, qx, qy, qradius, qcolor)
+        changed = np.flatnonzero((qx != base[0]) | (qy != base[1]) | (qcolor != base[3]).any(axis=1))
+        self.deltas += 1
+        return encode_delta(number, changed, qx[changed] - base[0][changed], qy[changed] - base[1][changed],
+                            qcolor[changed] - base[3][changed])
+
+    def stats(self):
+        return {
+            "port": self.port,
+            "clients": len(self.clients),
+            "clients_served": self.served,
+            "frames_published": self.published,
+            "keyframes": self.keyframes,
+            "deltas": self.deltas,
+            "bytes_sent": self.bytes_sent,
+        }
+
+    async def _shutdown(self):
+        self.server.close()
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def _stop_loop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def close(self, frames=None):
+        """Disconnect every client and stop the server thread."""
+        if self.loop.is_closed():
+            return
+        shutdown = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        try:
+            shutdown.result(timeout=5.0)
+        except (asyncio.TimeoutError, TimeoutError):
+            pass
+        self._stop_loop()
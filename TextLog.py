@@ -0,0 +1,56 @@
+# Human-readable text log of blob state
+import datetime
+import numpy as np
+
+class TextLog:
+    """Writes logged frames as one formatted line per blob."""
+
+    def __init__(self, path, metadata):
+        self.path = path
+        self.file = open(path, 'w')
+
+        # Write header
+        mode = metadata["mode"]
+        self.file.write(f"SwirlyColors {mode.title()} Simulation Log\n")
+        self.file.write(f"Started at: {metadata['started']}\n")
+        self.file.write(f"Configuration: {metadata['num_blobs']} blobs, radius {metadata['blob_radius']}\n")
+        self.file.write(f"World size: {metadata['width']}x{metadata['height']}\n")
+        self.file.write(f"Mode: {mode}\n")
+        self.file.write(f"Backend: {metadata['backend']}\n")
+        if metadata.get("seed") is not None:
+            self.file.write(f"Seed: {metadata['seed']}\n")
+        if metadata.get("max_frames", 0) > 0:
+            self.file.write(f"Max frames: {metadata['max_frames']}\n")
+        self.file.write("="*80 + "\n\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def append(self, frame, x, y, vx, vy, color):
+        """Write one frame of state; every column holds one entry per blob."""
+        self.file.write(f"Frame: {frame}\n")
+        rows = zip(*(np.asarray(column).tolist() for column in (x, y, vx, vy, color)))
+        for i, (x, y, vx, vy, color) in enumerate(rows):
+            self.file.write(
+                f"Blob {i:2d}: "
+                f"pos=({x:7.2f},{y:7.2f}) "
+                f"vel=({vx:6.3f},{vy:6.3f}) "
+                f"color=({color[0]:3d},{color[1]:3d},{color[2]:3d})\n"
+            )
+        self.file.write("\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self, total_frames=None):
+        """Write closing information and close the file."""
+        if self.file.closed:
+            return
+        self.file.write("="*80 + "\n")
+        self.file.write(f"Simulation ended at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if total_frames is not None:
+            self.file.write(f"Total frames: {total_frames}\n")
+        self.file.close()
@@ -0,0 +1,419 @@
+# World class holding the whole blob population as NumPy arrays
+import numpy as np
+from Config import config
+from Flocks import Flocks
+from PhaseTimer import NULL_TIMER
+from SpatialHash import SpatialHash
+
+class World:
+    """Structure-of-arrays blob population stepped with batched NumPy operations.
+
+    Each step follows the same rules as the per-object Blob loop: target search,
+    speed damping/normal-speed boost, toroidal wrap, collision memory decay and
+    escalating bounces with color mixing. settings is the run's RunConfig,
+    a fresh config snapshot by default.
+    """
+
+    # Random neighbourhood probes per searcher before falling back to a scan of it (as in ColorIndex)
+    SEARCH_PROBES = 32
+    # Neighbourhood members scanned at once by searchers whose probes all missed
+    SEARCH_CHUNK_CELLS = 1 << 22
+
+    def __init__(self, num_blobs, radius, width, height, seed=None, settings=None):
+        self.width = width
+        self.height = height
+        self.settings = settings = config.snapshot() if settings is None else settings
+        self.rng = np.random.default_rng(seed)
+
+        # Position
+        self.x = self.rng.uniform(radius, width - radius, num_blobs)
+        self.y = self.rng.uniform(radius, height - radius, num_blobs)
+
+        # Velocity
+        self.vx = self.rng.uniform(-settings.NORMAL_SPEED, settings.NORMAL_SPEED, num_blobs)
+        self.vy = self.rng.uniform(-settings.NORMAL_SPEED, settings.NORMAL_SPEED, num_blobs)
+
+        # Size and color (one RGB row per blob)
+        self.radius = np.full(num_blobs, float(radius))
+        self.color = self.rng.integers(
+            settings.MINIMUM_COLOR, settings.MAXIMUM_COLOR, size=(num_blobs, 3), endpoint=True
+        ).astype(np.int32)
+
+        # Collision memory: sorted pair keys (i * n + j with i < j) and their intensities
+        self.memory_keys = np.empty(0, dtype=np.int64)
+        self.memory_values = np.empty(0, dtype=np.float64)
+
+        # Broad phase grid, sized from the largest radius on first use
+        self.grid = None
+
+        # Connected components of touching, similarly colored blobs (when settings.FLOCKS is on)
+        self.flocks = Flocks()
+
+    @classmethod
+    def from_blobs(cls, blobs, width, height, seed=None, settings=None):
+        """Build a world holding the same state as a list of Blob objects."""
+        world = cls(0, 0, width, height, seed=seed, settings=settings)
+        world.x = np.array([blob.x for blob in blobs], dtype=np.float64)
+        world.y = np.array([blob.y for blob in blobs], dtype=np.float64)
+        world.vx = np.array([blob.vx for blob in blobs], dtype=np.float64)
+        world.vy = np.array([blob.vy for blob in blobs], dtype=np.float64)
+        world.radius = np.array([blob.radius for blob in blobs], dtype=np.float64)
+        world.color = np.array([blob.rgb for blob in blobs], dtype=np.int32).reshape(-1, 3)
+        return world
+
+    def state(self):
+        """Return the complete world state as a dict of arrays (see Checkpoint)."""
+        return {
+            "x": self.x, "y": self.y, "vx": self.vx, "vy": self.vy,
+            "radius": self.radius, "color": self.color.astype(np.uint8),
+            "memory_keys": self.memory_keys, "memory_values": self.memory_values,
+        }
+
+    @classmethod
+    def from_state(cls, state, width, height, rng_state, settings=None):
+        """Rebuild a world from state() arrays and its generator's bit_generator.state."""
+        world = cls(0, 0, width, height, settings=settings)
+        for name in ("x", "y", "vx", "vy", "radius", "memory_values"):
+            setattr(world, name, np.array(state[name], dtype=np.float64))
+        world.color = np.array(state["color"], dtype=np.int32)
+        world.memory_keys = np.array(state["memory_keys"], dtype=np.int64)
+        world.rng.bit_generator.state = rng_state
+        return world
+
+    def __len__(self):
+        return len(self.x)
+
+    def rows(self):
+        """Yield (x, y, vx, vy, radius, color) tuples of plain Python values for every blob."""
+        return zip(
+            self.x.tolist(), self.y.tolist(), self.vx.tolist(), self.vy.tolist(),
+            self.radius.tolist(), self.color.tolist()
+        )
+
+    def columns(self):
+        """Return the live (x, y, vx, vy, color) arrays; copy them to keep a snapshot."""
+        return self.x, self.y, self.vx, self.vy, self.color
+
+    def wrap_delta(self, dx, dy):
+        """Return the shortest toroidal displacement for raw coordinate differences."""
+        dx = dx - self.width * np.round(dx / self.width)
+        dy = dy - self.height * np.round(dy / self.height)
+        return dx, dy
+
+    def step(self, timer=NULL_TIMER):
+        """Advance the simulation by one frame."""
+        with timer.phase("search"):
+            self.search_for_targets(timer)
+        with timer.phase("move"):
+            self.move()
+        with timer.phase("collisions"):
+            i, j = self.find_contacts(timer)
+        with timer.phase("bounce"):
+            self.bounce(i, j, timer)
+        if self.settings.FLOCKS != "off":
+            with timer.phase("flocks"):
+                self.update_flocks(i, j, timer)
+
+    @property
+    def memory_pairs(self):
+        """Number of live entries in the collision memory."""
+        return len(self.memory_keys)
+
+    def search_for_targets(self, timer=NULL_TIMER):
+        """Kick a random subset of blobs towards a random similarly-colored blob."""
+        settings = self.settings
+        n = len(self)
+        searchers = np.flatnonzero(self.rng.random(n) <= settings.TARGET_SEARCH_CHANCE)
+        if searchers.size == 0 or n < 2 or settings.FLOCK_COLOR_THRESHOLD <= 0:
+            return
+
+        rows, targets = self._pick_targets(searchers)
+        timer.count("target_hits", rows.size)
+
+        # Direction to target (with toroidal wrapping)
+        dx, dy = self.wrap_delta(self.x[targets] - self.x[rows], self.y[targets] - self.y[rows])
+        distance = np.hypot(dx, dy)
+        moving = distance > 0
+        rows, dx, dy, distance = rows[moving], dx[moving], dy[moving], distance[moving]
+
+        self.vx[rows] += dx / distance * settings.VELOCITY_KICK_STRENGTH
+        self.vy[rows] += dy / distance * settings.VELOCITY_KICK_STRENGTH
+
+    def _pick_targets(self, searchers):
+        """Return (rows, targets): the searchers that found a match and a uniformly random match of each.
+
+        Like ColorIndex, blobs are bucketed on an RGB grid one threshold wide,
+        so every match lies in the 27 buckets around a searcher's own. Each
+        searcher probes SEARCH_PROBES random blobs of that neighbourhood and
+        takes the first match, which is uniform over its matches; only the
+        searchers whose probes all miss scan their whole neighbourhood.
+        """
+        threshold = self.settings.FLOCK_COLOR_THRESHOLD
+
+        # Bucket code per blob, with a spare bucket on both sides of every axis
+        side = int(255 // threshold) + 3
+        key = (self.color // threshold).astype(np.int64) + 1
+        code = (key[:, 0] * side + key[:, 1]) * side + key[:, 2]
+        # NumPy sorts 16-bit keys with a radix sort, several times faster than 64-bit ones
+        order = np.argsort(code.astype(np.uint16) if side ** 3 <= 1 << 16 else code, kind="stable")
+        buckets, bucket_start, bucket_size = np.unique(code[order], return_index=True, return_counts=True)
+
+        # Where each searcher's 27 neighbouring buckets start in order, and their sizes (0 where empty)
+        steps = np.arange(-1, 2)
+        offsets = ((steps[:, None, None] * side + steps[None, :, None]) * side + steps[None, None, :]).ravel()
+        neighbour = code[searchers, None] + offsets
+        slot = np.minimum(np.searchsorted(buckets, neighbour), buckets.size - 1)
+        present = buckets[slot] == neighbour
+        start = np.where(present, bucket_start[slot], 0)
+        size = np.where(present, bucket_size[slot], 0)
+        total = size.sum(axis=1)
+
+        # Rejection sampling: uniform over the neighbourhood, so uniform over the matches in it
+        m = searchers.size
+        picks = (self.rng.random((m, self.SEARCH_PROBES)) * total[:, None]).astype(np.int64)
+        candidates = order[self._neighbourhood_slots(start, size, picks)]
+        matches = self._matches(searchers, candidates)
+        found = matches.any(axis=1)
+        targets = candidates[np.arange(m), np.argmax(matches, axis=1)]
+
+        # Sparse neighbourhoods: collect every match and pick one
+        missed = np.flatnonzero(~found & (total > 1))
+        chunk = max(1, self.SEARCH_CHUNK_CELLS // max(1, int(total[missed].max(initial=0))))
+        for first in range(0, missed.size, chunk):
+            rows = missed[first:first + chunk]
+            members = np.arange(total[rows].max())
+            inside = members[None, :] < total[rows, None]
+            candidates = order[self._neighbourhood_slots(start[rows], size[rows], np.where(inside, members, 0))]
+            matches = inside & self._matches(searchers[rows], candidates)
+            counts = matches.sum(axis=1)
+            choice = (self.rng.random(rows.size) * counts).astype(np.int64)
+            picked = np.argmax(matches.cumsum(axis=1) > choice[:, None], axis=1)
+            found[rows] = counts > 0
+            targets[rows] = candidates[np.arange(rows.size), picked]
+        return searchers[found], targets[found]
+
+    @staticmethod
+    def _neighbourhood_slots(start, size, picks):
+        """Map positions picks[k] within row k's run of buckets to slots of the bucket-sorted blob order."""
+        rows, buckets = size.shape
+        end = np.cumsum(size, axis=1)
+        # One sorted search over every row, each row shifted past the end of the previous one
+        shift = (np.arange(rows) * (int(end[:, -1].max(initial=0)) + 1))[:, None]
+        bucket = np.searchsorted((end + shift).ravel(), (picks + shift).ravel(), side="right").reshape(picks.shape)
+        bucket -= (np.arange(rows) * buckets)[:, None]
+        bucket = np.minimum(bucket, buckets - 1)
+        row = np.arange(rows)[:, None]
+        return start[row, bucket] + picks - (end - size)[row, bucket]
+
+    def _matches(self, blobs, candidates):
+        """Tell which candidates[k] are preferential matches of blobs[k] (a blob never matches itself)."""
+        diff = self.color[blobs, None, :] - self.color[candidates]
+        return ((diff * diff).sum(axis=2) < self.settings.FLOCK_COLOR_THRESHOLD_SQ) & (candidates != blobs[:, None])
+
+    def move(self):
+        """Move all blobs, wrap around screen edges and decay collision memory."""
+        move_blobs(self.x, self.y, self.vx, self.vy, self.move_params())
+        self._decay_memory()
+
+    def _decay_memory(self):
+        """Decay collision memory and forget faded pairs."""
+        self.memory_values *= self.settings.COLLISION_MEMORY_DECAY
+        keep = self.memory_values >= 0.1
+        self.memory_keys = self.memory_keys[keep]
+        self.memory_values = self.memory_values[keep]
+
+    def move_params(self):
+        """Return the settings move_blobs() needs, as a plain tuple that can go to a worker process."""
+        settings = self.settings
+        return settings.MAX_SPEED, settings.SPEED_DAMPING, settings.NORMAL_SPEED, self.width, self.height
+
+    def find_contacts(self, timer=NULL_TIMER):
+        """Return index arrays (i, j), i < j, of overlapping blobs in loop order."""
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        i, j = self.contact_grid().candidate_pairs(self.x, self.y)
+        timer.count("collision_candidates", i.size)
+        dx, dy = self.wrap_delta(self.x[i] - self.x[j], self.y[i] - self.y[j])
+        touching = np.hypot(dx, dy) < self.radius[i] + self.radius[j]
+        return i[touching], j[touching]
+
+    def contact_grid(self):
+        """Return the broad-phase grid, rebuilt if blobs have grown past its cell size."""
+        # Cells must be at least one contact distance wide for neighbours to cover every pair
+        reach = 2 * self.radius.max()
+        if self.grid is None or self.grid.cell_size < reach:
+            self.grid = SpatialHash(reach, self.width, self.height)
+        return self.grid
+
+    def bounce(self, i, j, timer=NULL_TIMER):
+        """Resolve touching pairs (i, j), matching the sequential loop order of the Blob backend.
+
+        Every pair's random color push and collision intensity are drawn and
+        looked up before any pair bounces, so the outcome does not depend on
+        how the pairs are later split up (see resolve_contacts).
+        """
+        strength, flip, intensity = self.bounce_inputs(i, j)
+        bounced = resolve_contacts(self.columns(), i, j, strength, flip, intensity, self.bounce_params())
+        timer.count("collisions", int(bounced.sum()))
+        self._store_collisions(i[bounced], j[bounced], intensity[bounced])
+
+    def bounce_inputs(self, i, j):
+        """Return (strength, flip, intensity) for touching pairs (i, j).
+
+        strength and flip are each pair's color push per channel and the
+        direction of the push for tied channels; intensity is the collision
+        memory the pair would have after bumping it.
+        """
+        # Small integer types keep these cheap to send to worker processes
+        strength = self.rng.integers(10, 30, size=(len(i), 3), endpoint=True).astype(np.int8)
+        flip = self.rng.choice((-1, 1), size=(len(i), 3)).astype(np.int8)
+        return strength, flip, self._recall_collisions(i, j)
+
+    def bounce_params(self):
+        """Return the settings resolve_contacts() needs, as a plain tuple that can go to a worker process."""
+        settings = self.settings
+        return (self.width, self.height, settings.FLOCK_COLOR_THRESHOLD_SQ,
+                settings.MINIMUM_COLOR, settings.MAXIMUM_COLOR)
+
+    def update_flocks(self, i, j, timer=NULL_TIMER):
+        """Rebuild the flocks from touching pairs (i, j) and, when aligning, move each flock as one."""
+        diff = self.color[i] - self.color[j]
+        matched = (diff * diff).sum(axis=1) < self.settings.FLOCK_COLOR_THRESHOLD_SQ
+        i, j = i[matched], j[matched]
+        self.flocks.update(len(self), i, j)
+        timer.count("flocks", self.flocks.count)
+        if self.settings.FLOCKS == "align":
+            self.flocks.align(self.vx, self.vy)
+            # Flock mates move together, so their bounce history no longer applies
+            forget = np.isin(self.memory_keys, i.astype(np.int64) * len(self) + j)
+            self.memory_keys = self.memory_keys[~forget]
+            self.memory_values = self.memory_values[~forget]
+
+    def _recall_collisions(self, a, b):
+        """Return the collision intensity each pair (a, b) would have after one more bump."""
+        keys = a.astype(np.int64) * len(self) + b
+        slot = np.minimum(np.searchsorted(self.memory_keys, keys), max(0, self.memory_keys.size - 1))
+        known = self.memory_keys[slot] == keys if self.memory_keys.size else np.zeros(keys.size, dtype=bool)
+        intensity = np.ones(keys.size)
+        intensity[known] = np.minimum(10.0, self.memory_values[slot[known]] + 1.0)
+        return intensity
+
+    def _store_collisions(self, a, b, intensity):
+        """Set the collision intensity of pairs (a, b), adding the pairs not yet remembered."""
+        keys = a.astype(np.int64) * len(self) + b
+        slot = np.minimum(np.searchsorted(self.memory_keys, keys), max(0, self.memory_keys.size - 1))
+        known = self.memory_keys[slot] == keys if self.memory_keys.size else np.zeros(keys.size, dtype=bool)
+        self.memory_values[slot[known]] = intensity[known]
+
+        if not known.all():
+            merged_keys = np.concatenate((self.memory_keys, keys[~known]))
+            merged_values = np.concatenate((self.memory_values, intensity[~known]))
+            order = np.argsort(merged_keys, kind="stable")
+            self.memory_keys = merged_keys[order]
+            self.memory_values = merged_values[order]
+
+def move_blobs(x, y, vx, vy, params):
+    """Apply speed damping/boost and move blobs with wrapping, in place (arrays may be views of shared memory)."""
+    max_speed, damping, normal_speed, width, height = params
+    current_speed = np.hypot(vx, vy)
+    fast = current_speed > max_speed
+    slow = ~fast & (current_speed < normal_speed)
+
+    # Apply speed damping
+    vx[fast] *= damping
+    vy[fast] *= damping
+
+    # Apply normal speed to maintain typical movement
+    vx[slow] += normal_speed
+    vy[slow] += normal_speed
+
+    # Move and wrap around screen
+    np.add(x, vx, out=x)
+    np.mod(x, width, out=x)
+    np.add(y, vy, out=y)
+    np.mod(y, height, out=y)
+
+def resolve_contacts(columns, i, j, strength, flip, intensity, params):
+    """Bounce touching pairs (i, j) off each other in loop order and return a mask of the pairs that bounced.
+
+    columns are the (x, y, vx, vy, color) arrays, updated in place; strength,
+    flip and intensity come from World.bounce_inputs and params from
+    World.bounce_params. Pairs are applied in rounds: a pair is ready once no
+    earlier pending pair shares one of its blobs, so every blob sees its
+    contacts in the same order as the nested Python loop while each round
+    runs as one batched update. Groups of pairs that share no blob with each
+    other do not interact, so they may be resolved separately, in any order.
+    """
+    n = len(columns[0])
+    bounced = np.zeros(len(i), dtype=bool)
+    pending = np.arange(len(i))
+    first = np.empty(n, dtype=np.int64)
+    while pending.size:
+        a, b = i[pending], j[pending]
+        ends = np.column_stack((a, b)).ravel()
+        blob_ids, first_end = np.unique(ends, return_index=True)
+        first[blob_ids] = first_end // 2
+        position = np.arange(pending.size)
+        ready = (first[a] == position) & (first[b] == position)
+        pairs = pending[ready]
+        bounced[pairs] = _bounce_pairs(columns, i[pairs], j[pairs], strength[pairs], flip[pairs],
+                                       intensity[pairs], params)
+        pending = pending[~ready]
+    return bounced
+
+def _bounce_pairs(columns, a, b, strength, flip, intensity, params):
+    """Bounce disjoint pairs of blobs off each other in one batched update; return which of them bounced."""
+    x, y, vx, vy, color = columns
+    width, height, threshold_sq, low, high = params
+
+    # Similar colors never collide, so only the bouncing branch of Blob.bounce_off applies
+    diff = color[a] - color[b]
+    color_distance_sq = (diff * diff).sum(axis=1)
+
+    # Calculate collision normal (with toroidal wrapping)
+    dx = x[a] - x[b]
+    dy = y[a] - y[b]
+    dx = dx - width * np.round(dx / width)
+    dy = dy - height * np.round(dy / height)
+    distance = np.hypot(dx, dy)
+
+    bouncing = (color_distance_sq >= threshold_sq) & (distance > 0)
+    a, b, dx, dy, distance = a[bouncing], b[bouncing], dx[bouncing], dy[bouncing], distance[bouncing]
+    if a.size == 0:
+        return bouncing
+    dx /= distance
+    dy /= distance
+
+    bounce_multiplier = np.maximum(1.0, intensity[bouncing])
+
+    # Simple velocity swap along collision normal with escalating force
+    v1_normal = vx[a] * dx + vy[a] * dy
+    v2_normal = vx[b] * dx + vy[b] * dy
+
+    force = (v2_normal - v1_normal) * bounce_multiplier
+    vx[a] += force * dx
+    vy[a] += force * dy
+
+    force = (v1_normal - v2_normal) * bounce_multiplier
+    vx[b] += force * dx
+    vy[b] += force * dy
+
+    # Add separation force to prevent overlap
+    separation_force = bounce_multiplier * 0.5
+    vx[a] += dx * separation_force
+    vy[a] += dy * separation_force
+    vx[b] -= dx * separation_force
+    vy[b] -= dy * separation_force
+
+    color_bounce(color, a, b, strength[bouncing], flip[bouncing], low, high)
+    return bouncing
+
+def color_bounce(color, a, b, strength, flip, low, high):
+    """Push the colors of bouncing pairs apart channel by channel."""
+    # Higher channel goes higher, lower goes lower; ties go the pair's flip direction
+    direction = np.sign(color[a] - color[b])
+    direction = np.where(direction == 0, flip, direction)
+
+    push = direction * strength
+    color[a] = np.clip(color[a] + push, low, high)
+    color[b] = np.clip(color[b] - push, low, high)
@@ -0,0 +1,228 @@
+"""Benchmark frame time across blob counts, world sizes and simulation phases.
+
+Examples:
+    python benchmark.py --output results.json
+    python benchmark.py --counts 100,1000,10000 --compare baseline.json
+    python benchmark.py --current results.json --compare baseline.json
+
+    python benchmark.py --backends numpy,parallel --workers 8 --verify
+
+Every case runs headless with a fixed seed and reports mean milliseconds per
+frame for each phase: search, move, collisions, bounce, flocks (when enabled),
+log and, when pygame is installed, draw. Compare mode flags cases and phases
+that got slower than the baseline by more than --threshold and exits with
+status 1 if any did.
+Verify mode steps the numpy and parallel backends side by side for every case
+and exits with status 1 if their states ever differ.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+from Config import config
+from PhaseTimer import PhaseTimer
+from simulation import create_world, open_log
+
+PHASES = ("search", "move", "collisions", "bounce", "flocks", "log", "draw")
+
+def world_sizes(spec, num_blobs, reference_blobs):
+    """Return (width, height) pairs for a --sizes spec ("auto" or "WxH,WxH")."""
+    if spec == "auto":
+        # Scale the configured world so every count sees the density of reference_blobs
+        scale = math.sqrt(num_blobs / reference_blobs)
+        return [(max(1, round(config.WIDTH * scale)), max(1, round(config.HEIGHT * scale)))]
+    return [tuple(int(value) for value in size.split("x")) for size in spec.split(",")]
+
+def open_display(width, height, settings):
+    """Return an offscreen Display for timing the draw phase, or None without pygame."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        from Display import Display
+        return Display(min(width, settings.WIDTH), min(height, settings.HEIGHT), settings=settings)
+    except Exception:
+        return None
+
+def run_case(backend, num_blobs, width, height, frames, warmup, seed, settings):
+    """Time one configuration of the run's settings and return its result row."""
+    settings = settings.replace(BACKEND=backend, NUM_BLOBS=num_blobs)
+    world = create_world(width, height, seed, settings)
+    display = open_display(width, height, settings)
+
+    timer = PhaseTimer()
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_file = open_log(os.path.join(log_dir, "benchmark.log"), {
+            "mode": "benchmark", "backend": backend, "started": "", "seed": seed,
+            "num_blobs": num_blobs, "blob_radius": settings.BLOB_RADIUS, "width": width, "height": height,
+        }, settings)
+        frame_start = 0.0
+        for frame in range(warmup + frames):
+            if frame == warmup:
+                timer.reset()
+                frame_start = time.perf_counter()
+            world.step(timer)
+            with timer.phase("log"):
+                log_file.append(frame, *world.columns())
+                log_file.flush()
+            if display:
+                with timer.phase("draw"):
+                    display.clear()
+                    if settings.BATCHED_RENDERING:
+                        x, y, vx, vy, color = world.columns()
+                        display.draw_blobs(x, y, world.radius, color)
+                    else:
+                        for x, y, vx, vy, radius, color in world.rows():
+                            display.draw_blob(x, y, radius, color)
+        elapsed = time.perf_counter() - frame_start
+        log_file.close(total_frames=warmup + frames)
+    if display:
+        display.close()
+    if backend == "parallel":
+        world.close()
+
+    return {
+        "backend": backend,
+        "num_blobs": num_blobs,
+        "width": width,
+        "height": height,
+        "frames": frames,
+        "frame_ms": 1000 * elapsed / frames,
+        "fps": frames / elapsed if elapsed > 0 else float("inf"),
+        "phases_ms": {name: 1000 * timer.totals.get(name, 0.0) / frames for name in PHASES if name in timer.totals},
+    }
+
+def run_benchmark(args, settings):
+    results = []
+    for num_blobs in [int(count) for count in args.counts.split(",")]:
+        for width, height in world_sizes(args.sizes, num_blobs, args.reference_blobs):
+            for backend in args.backends.split(","):
+                if backend == "objects" and num_blobs > args.max_object_blobs:
+                    print(f"Skipping objects backend at {num_blobs} blobs (see --max-object-blobs)")
+                    continue
+                row = run_case(backend, num_blobs, width, height, args.frames, args.warmup, args.seed, settings)
+                phases = ", ".join(f"{name} {ms:.2f}" for name, ms in row["phases_ms"].items())
+                print(f"{backend:7s} {num_blobs:7d} blobs {width}x{height}: {row['frame_ms']:.2f} ms/frame ({phases})")
+                results.append(row)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "log_format": args.log_format,
+        },
+        "results": results,
+    }
+
+def verify_parallel(num_blobs, width, height, frames, seed, settings):
+    """Step a World and a ParallelWorld from the same seed; return the first frame where they differ, or None."""
+    from World import World
+    from ParallelWorld import ParallelWorld
+    settings = settings.replace(NUM_BLOBS=num_blobs)
+    world = World(num_blobs, settings.BLOB_RADIUS, width, height, seed=seed, settings=settings)
+    parallel = ParallelWorld(num_blobs, settings.BLOB_RADIUS, width, height, seed=seed, workers=settings.WORKERS,
+                             settings=settings)
+    world_timer, parallel_timer = PhaseTimer(), PhaseTimer()
+    try:
+        for frame in range(frames):
+            world.step(world_timer)
+            parallel.step(parallel_timer)
+            for name in ("x", "y", "vx", "vy", "color", "memory_keys", "memory_values"):
+                if not np.array_equal(getattr(world, name), getattr(parallel, name), equal_nan=True):
+                    return frame
+            if world_timer.counters != parallel_timer.counters:
+                return frame
+    finally:
+        parallel.close()
+    return None
+
+def run_verify(args, settings):
+    """Check the parallel backend against the numpy backend for every case; return the number of mismatches."""
+    mismatches = 0
+    for num_blobs in [int(count) for count in args.counts.split(",")]:
+        for width, height in world_sizes(args.sizes, num_blobs, args.reference_blobs):
+            frame = verify_parallel(num_blobs, width, height, args.frames, args.seed, settings)
+            result = "identical" if frame is None else f"MISMATCH at frame {frame}"
+            print(f"parallel vs numpy {num_blobs:7d} blobs {width}x{height}, {args.frames} frames: {result}")
+            mismatches += frame is not None
+    return mismatches
+
+def compare(current, baseline, threshold, min_ms):
+    """Print current vs baseline timings and return the list of regressions."""
+    def key(row):
+        return (row["backend"], row["num_blobs"], row["width"], row["height"])
+
+    baseline_rows = {key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = baseline_rows.get(key(row))
+        if old is None:
+            print(f"{key(row)}: no baseline")
+            continue
+        metrics = [("frame", row["frame_ms"], old["frame_ms"])]
+        metrics += [(name, ms, old["phases_ms"].get(name)) for name, ms in row["phases_ms"].items()]
+        for name, new_ms, old_ms in metrics:
+            if old_ms is None:
+                continue
+            ratio = new_ms / old_ms if old_ms > 0 else float("inf")
+            regressed = new_ms > old_ms * (1 + threshold) and new_ms - old_ms > min_ms
+            flag = "REGRESSION" if regressed else ""
+            print(f"{key(row)} {name:10s} {old_ms:9.3f} -> {new_ms:9.3f} ms ({ratio:5.2f}x) {flag}")
+            if regressed:
+                regressions.append((key(row), name, old_ms, new_ms))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark simulation frame time")
+    parser.add_argument("--counts", default="100,1000,10000,100000", help="Comma-separated blob counts")
+    parser.add_argument("--sizes", default="auto",
+                        help="'auto' (keep density constant) or comma-separated WxH world sizes")
+    parser.add_argument("--reference-blobs", type=int, default=1000,
+                        help="Blob count that fills the configured world in 'auto' sizing")
+    parser.add_argument("--backends", default="objects,numpy", help="Comma-separated backends")
+    parser.add_argument("--max-object-blobs", type=int, default=10000,
+                        help="Skip the objects backend above this blob count")
+    parser.add_argument("--workers", type=int, default=config.WORKERS,
+                        help="Worker processes of the parallel backend (0 = one per core)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the parallel backend against the numpy backend instead of timing")
+    parser.add_argument("--frames", type=int, default=20, help="Timed frames per case")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed frames before timing")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--log-format", choices=("text", "binary"), default=config.LOG_FORMAT)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--current", help="Compare this results file instead of running the benchmark")
+    parser.add_argument("--compare", metavar="BASELINE", help="Flag regressions against a baseline results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="Ignore slowdowns smaller than this many ms")
+    args = parser.parse_args()
+    settings = config.snapshot().replace(WORKERS=args.workers, LOG_FORMAT=args.log_format)
+
+    if args.verify:
+        sys.exit(1 if run_verify(args, settings) else 0)
+
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run_benchmark(args, settings)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+            print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold, args.min_ms)
+        print(f"{len(regressions)} regression(s)")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,93 @@
+import argparse
 import os
+import cProfile
 import datetime
-from Blob import Blob
+import numpy as np
+from AsyncLog import AsyncLog
+from Checkpoint import load_checkpoint, save_checkpoint
 from Config import config
+from FrameStream import FrameStream, LogSink
+from Metrics import Metrics
+from PhaseTimer import NULL_TIMER
+from Population import Population
+from RandomStreams import fresh_seed
+from Scheduler import Scheduler
+from TextLog import TextLog
 
-def run_simulation():
-    """Run the simulation with optional display."""
+def create_world(width, height, seed=None, settings=None):
+    """Create the blob population for the configured backend ("objects", "numpy" or "parallel").
+
+    settings is the RunConfig to build from, a fresh config snapshot by default.
+    """
+    settings = config.snapshot() if settings is None else settings
+    if settings.BACKEND == "numpy":
+        from World import World
+        return World(settings.NUM_BLOBS, settings.BLOB_RADIUS, width, height, seed=seed, settings=settings)
+    if settings.BACKEND == "parallel":
+        from ParallelWorld import ParallelWorld
+        return ParallelWorld(settings.NUM_BLOBS, settings.BLOB_RADIUS, width, height, seed=seed,
+                             workers=settings.WORKERS, settings=settings)
+    return Population(settings.NUM_BLOBS, settings.BLOB_RADIUS, width, height, seed=seed, settings=settings)
+
+def dump_profile(profiler, path):
+    """Stop a cProfile window and save its stats."""
+    profiler.disable()
+    profiler.dump_stats(path)
+    print(f"Profile saved to {path} (view with: python -m pstats {path})")
+
+def open_log(path, metadata, settings=None):
+    """Open a log of the configured format ("text" or "binary"), on a writer thread if enabled."""
+    settings = config.snapshot() if settings is None else settings
+    if settings.LOG_FORMAT == "binary":
+        from SnapshotLog import SnapshotWriter
+        log = SnapshotWriter(path, metadata["num_blobs"], metadata)
+    else:
+        log = TextLog(path, metadata)
+    if settings.ASYNC_LOG:
+        return AsyncLog(log, settings.LOG_QUEUE_SIZE, settings.LOG_BACKPRESSURE)
+    return log
+
+def run_simulation(seed=None, log_name=None, metrics=None, resume=None, settings=None):
+    """Run the simulation with optional display and return a summary of the run.
+
+    seed makes the run reproducible; without one a fresh seed is drawn, so
+    every run can be replayed from the seed in its log header. log_name
+    replaces the timestamped log file name (used by sweeps to give every run
+    its own log). Pass a Metrics
+    instance to read instrumentation while the run is going; one is created
+    automatically when instrumentation is enabled in the config. resume is
+    the path of a checkpoint to continue from instead of a fresh world.
+
+    settings is the run's RunConfig; by default the config is snapshotted
+    once here, so reloading it during the run does not affect this run.
+    """
+    started = datetime.datetime.now()
+    settings = config.snapshot() if settings is None else settings
+    if resume is not None:
+        world, frame_count, seed = load_checkpoint(resume, settings)
+        settings = world.settings
+        print(f"Resuming from {resume} at frame {frame_count}")
+    else:
+        if seed is None:
+            seed = fresh_seed()
+        print(f"Seed: {seed}")
     
     # Get dimensions from config
-    WIDTH, HEIGHT = config.WIDTH, config.HEIGHT
+    WIDTH, HEIGHT = settings.WIDTH, settings.HEIGHT
     
     # Initialize display only if enabled
     display = None
-    if config.ENABLE_DISPLAY:
+    if settings.ENABLE_DISPLAY:
         try:
             print("Attempting to import Display...")
             from Display import Display
             print("Display imported successfully")
             print("Creating Display instance...")
-            display = Display(WIDTH, HEIGHT)
-            print(f"Display enabled - running with pygame visualization ({WIDTH}x{HEIGHT})")
+            # The window shows a camera view of the world (all of it by default)
+            window_width, window_height = settings.WINDOW_WIDTH or WIDTH, settings.WINDOW_HEIGHT or HEIGHT
+            display = Display(window_width, window_height, WIDTH, HEIGHT, settings)
+            print(f"Display enabled - running with pygame visualization ({window_width}x{window_height} "
+                  f"window onto a {WIDTH}x{HEIGHT} world)")
         except ImportError as e:
             print(f"ImportError: {e}")
             print("pygame not available - running headless")
@@ -30,8 +99,14 @@ def run_simulation():
     else:
         print(f"Display disabled - running headless simulation ({WIDTH}x{HEIGHT})")
     
-    # Create blobs
-    blobs = [Blob(config.BLOB_RADIUS, WIDTH, HEIGHT) for _ in range(config.NUM_BLOBS)]
+    # Create blobs for the selected backend
+    if resume is None:
+        world = create_world(WIDTH, HEIGHT, seed, settings)
+        frame_count = 0
+    if settings.BACKEND == "numpy":
+        print(f"Using numpy backend with {settings.NUM_BLOBS} blobs")
+    elif settings.BACKEND == "parallel":
+        print(f"Using parallel backend with {settings.NUM_BLOBS} blobs on {world.workers} workers")
     
     # Set up logging
     logs_dir = "logs"
@@ -39,28 +114,63 @@ def run_simulation():
         os.makedirs(logs_dir)
     
     # Create log filename with timestamp
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    timestamp = started.strftime("%Y-%m-%d-%H-%M-%S")
     mode = "visual" if display else "headless"
-    log_filename = os.path.join(logs_dir, f"{mode}-{timestamp}.log")
+    extension = "swlog" if settings.LOG_FORMAT == "binary" else "log"
+    log_base = os.path.join(logs_dir, log_name or f"{mode}-{timestamp}")
+    log_filename = f"{log_base}.{extension}"
+    
+    # Instrumentation costs one no-op context per phase when disabled
+    if metrics is None and settings.METRICS_ENABLED:
+        metrics = Metrics(settings.METRICS_WINDOW)
+    timer = metrics if metrics is not None else NULL_TIMER
+    metrics_filename = f"{log_base}.metrics.jsonl"
+    
+    # Optional cProfile window over a range of frames
+    profiler = None
+    profile_end = settings.PROFILE_START_FRAME + settings.PROFILE_FRAMES
+    
+    # Fixed-timestep ticks when a tick rate is set, otherwise one tick per rendered frame
+    scheduler = Scheduler(settings.TICK_RATE, settings.FPS, settings.MAX_CATCHUP_TICKS)
     
-    # Initialize frame counter
-    frame_count = 0
+    # Periodic checkpoints overwrite one file next to the log
+    checkpoint_filename = f"{log_base}.ckpt"
     
     # Determine when to stop
-    max_frames = config.MAX_FRAMES if config.MAX_FRAMES > 0 else float('inf')
+    max_frames = settings.MAX_FRAMES if settings.MAX_FRAMES > 0 else float('inf')
     
-    # Open log file
-    with open(log_filename, 'w') as log_file:
-        # Write header
-        log_file.write(f"SwirlyColors {mode.title()} Simulation Log\n")
-        log_file.write(f"Started at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        log_file.write(f"Configuration: {config.NUM_BLOBS} blobs, radius {config.BLOB_RADIUS}\n")
-        log_file.write(f"World size: {WIDTH}x{HEIGHT}\n")
-        log_file.write(f"Mode: {mode}\n")
-        if config.MAX_FRAMES > 0:
-            log_file.write(f"Max frames: {config.MAX_FRAMES}\n")
-        log_file.write("="*80 + "\n\n")
-        
+    # Open log file (the header is written from this metadata)
+    metadata = {
+        "mode": mode,
+        "backend": settings.BACKEND,
+        "started": started.strftime('%Y-%m-%d %H:%M:%S'),
+        "seed": seed,
+        "num_blobs": settings.NUM_BLOBS,
+        "blob_radius": settings.BLOB_RADIUS,
+        "width": WIDTH,
+        "height": HEIGHT,
+        "max_frames": settings.MAX_FRAMES,
+    }
+    with open_log(log_filename, metadata, settings) as log_file:
+        stream = FrameStream(world, timer, start_frame=frame_count)
+        stream.add_sink(LogSink(log_file), every=settings.LOG_INTERVAL_FRAMES, phase="log")
+        exporter = None
+        if settings.EXPORT_ENABLED:
+            from FrameExport import FrameExporter
+            exporter = FrameExporter(
+                f"{log_base}-frames", WIDTH, HEIGHT, settings.EXPORT_FORMAT, settings.EXPORT_WORKERS or None,
+                settings.EXPORT_MEMORY_BUDGET_MB << 20, settings.EXPORT_PNG_COMPRESSION, settings
+            )
+            stream.add_sink(exporter, every=settings.EXPORT_INTERVAL_FRAMES, phase="export")
+        server = None
+        if settings.SERVER_ENABLED:
+            from StreamServer import StreamServer
+            server = StreamServer(
+                WIDTH, HEIGHT, settings.SERVER_HOST, settings.SERVER_PORT, settings.SERVER_MAX_CLIENT_FPS,
+                settings.SERVER_KEYFRAME_INTERVAL, settings.SERVER_MAX_CLIENTS
+            )
+            stream.add_sink(server, phase="serve")
+            print(f"Streaming frames on {server.host}:{server.port} (watch with: python watch.py --port {server.port})")
         running = True
         
         try:
@@ -68,59 +178,123 @@ def run_simulation():
                 # Handle events (only if display exists)
                 if display:
                     running = display.handle_events()
-                    display.clear()
-                
-                # Core simulation logic
-                for blob in blobs:
-                    blob.search_for_target(blobs)  
-                    blob.move()
-                
-                # Check collisions
-                for i, blob1 in enumerate(blobs):
-                    for j in range(i + 1, len(blobs)):
-                        blob2 = blobs[j]
-                        if blob1.collides_with(blob2):
-                            blob1.bounce_off(blob2)
                 
-                # Draw blobs (only if display exists)
-                if display:
-                    for blob in blobs:
-                        display.draw_blob(blob.x, blob.y, blob.radius, blob.color)
-                    display.update()
-                
-                # Log data
-                if frame_count % config.LOG_INTERVAL_FRAMES == 0:
-                    log_file.write(f"Frame: {frame_count}\n")
-                    for i, blob in enumerate(blobs):
-                        log_file.write(
-                            f"Blob {i:2d}: "
-                            f"pos=({blob.x:7.2f},{blob.y:7.2f}) "
-                            f"vel=({blob.vx:6.3f},{blob.vy:6.3f}) "
-                            f"color=({blob.color[0]:3d},{blob.color[1]:3d},{blob.color[2]:3d})\n"
-                        )
-                    log_file.write("\n")
-                    log_file.flush()
+                # Run every simulation tick that is due; each tick is one logged frame
+                for _ in range(scheduler.ticks_due(max_frames - frame_count)):
+                    if settings.PROFILE_FRAMES > 0 and frame_count == settings.PROFILE_START_FRAME:
+                        profiler = cProfile.Profile()
+                        profiler.enable()
+                    
+                    # Core simulation logic; the log sink runs on its interval
+                    stream.step()
+                    frame_count += 1
+                    
+                    if metrics is not None and frame_count % settings.METRICS_INTERVAL_FRAMES == 0:
+                        metrics.export(metrics_filename, frame_count)
+                    if settings.CHECKPOINT_INTERVAL_FRAMES > 0 and frame_count % settings.CHECKPOINT_INTERVAL_FRAMES == 0:
+                        save_checkpoint(checkpoint_filename, world, frame_count, seed)
+                    if profiler is not None and frame_count == profile_end:
+                        dump_profile(profiler, f"{log_base}.prof")
+                        profiler = None
+                    
+                    # Print progress for headless mode
+                    if not display and frame_count % 100 == 0:
+                        print(f"Frame: {frame_count}")
                 
-                frame_count += 1
+                # Draw blobs (only if display exists); ticks never run mid-draw
+                if display and scheduler.render_due():
+                    with timer.phase("draw"):
+                        display.clear()
+                        if settings.BATCHED_RENDERING:
+                            frame = stream.view()
+                            display.draw_blobs(frame.x, frame.y, frame.radius, frame.color, world.grid)
+                        else:
+                            for x, y, vx, vy, radius, color in world.rows():
+                                display.draw_blob(x, y, radius, color)
+                    display.update(limit_fps=scheduler.locked)
                 
-                # Print progress for headless mode
-                if not display and frame_count % 100 == 0:
-                    print(f"Frame: {frame_count}")
+                scheduler.wait(rendering=display is not None)
         
         except KeyboardInterrupt:
             print("\nSimulation interrupted by user")
         
+        if profiler is not None:
+            dump_profile(profiler, f"{log_base}.prof")
+        if settings.CHECKPOINT_INTERVAL_FRAMES > 0:
+            save_checkpoint(checkpoint_filename, world, frame_count, seed)
+            print(f"Checkpoint saved to {checkpoint_filename}")
+        if metrics is not None:
+            metrics.export(metrics_filename, frame_count)
+            print(f"Metrics saved to {metrics_filename}")
+        
         # Write closing information
-        log_file.write("="*80 + "\n")
-        log_file.write(f"Simulation ended at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        log_file.write(f"Total frames: {frame_count}\n")
+        stream.close()
+        
+        if exporter is not None:
+            stats = exporter.stats()
+            print(
+                f"Exported {stats['frames']} {settings.EXPORT_FORMAT} frames to {exporter.directory} "
+                f"in {stats['seconds']:.1f} s ({stats['fps']:.1f} fps, {stats['stalls']} stalls on the memory budget)"
+            )
+        
+        if server is not None:
+            stats = server.stats()
+            print(
+                f"Stream server: {stats['clients_served']} clients served, {stats['keyframes']} keyframes and "
+                f"{stats['deltas']} deltas sent ({stats['bytes_sent'] / 1e6:.1f} MB)"
+            )
+        
+        if isinstance(log_file, AsyncLog):
+            stats = log_file.stats()
+            print(
+                f"Log writer: {stats['written_frames']} frames written, "
+                f"{stats['dropped_frames']} dropped, {stats['coalesced_frames']} coalesced, "
+                f"max queue depth {stats['max_queue_depth']}, max lag {stats['max_writer_lag'] * 1000:.1f} ms"
+            )
     
-    # Clean up display
+    # Clean up display and worker processes
     if display:
         display.close()
+    if settings.BACKEND == "parallel":
+        world.close()
+    
+    if not scheduler.locked:
+        stats = scheduler.stats()
+        print(
+            f"Scheduler: {stats['ticks']} ticks, {stats['renders']} renders, "
+            f"{stats['dropped_renders']} renders dropped, {stats['skipped_ticks']} ticks skipped"
+        )
+        if stats["ticks_per_render"] is not None:
+            print(f"Tick/render ratio: {stats['ticks_per_render']:.2f}")
     
     print(f"Simulation complete. Log saved to {log_filename}")
     print(f"Total frames: {frame_count}")
+    
+    # Summarize the final state
+    x, y, vx, vy, color = world.columns()
+    return {
+        "log_filename": log_filename,
+        "frames": frame_count,
+        "seed": seed,
+        "seconds": (datetime.datetime.now() - started).total_seconds(),
+        "mean_speed": float(np.hypot(vx, vy).mean()) if len(vx) else 0.0,
+        "color_spread": float(np.asarray(color).std(axis=0).mean()) if len(vx) else 0.0,
+        "metrics": metrics.snapshot() if metrics is not None else None,
+        "scheduler": scheduler.stats(),
+        "export": exporter.stats() if exporter is not None else None,
+        "server": server.stats() if server is not None else None,
+    }
 
 if __name__ == "__main__":
-    run_simulation()
+    parser = argparse.ArgumentParser(description="Run the blob simulation")
+    parser.add_argument("--seed", type=int, help="Seed for a reproducible run")
+    parser.add_argument("--resume", metavar="CHECKPOINT", help="Continue from a checkpoint file")
+    parser.add_argument("--serve", action="store_true", help="Run headless and stream frames to TCP clients")
+    parser.add_argument("--port", type=int, help="Port of the stream server (default: server.port)")
+    args = parser.parse_args()
+    settings = config.snapshot()
+    if args.serve:
+        settings = settings.replace(ENABLE_DISPLAY=False, SERVER_ENABLED=True)
+    if args.port is not None:
+        settings = settings.replace(SERVER_PORT=args.port)
+    run_simulation(seed=args.seed, resume=args.resume, settings=settings)
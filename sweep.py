@@ -0,0 +1,122 @@
+"""Run headless simulations over a grid of config overrides in parallel.
+
+Example:
+    python sweep.py --frames 2000 \\
+        --grid physics.velocity_kick_strength=0.05,0.1,0.2 \\
+        --grid behavior.flock_color_threshold=30,50
+
+Every run gets its own process (one per core by default), its own config
+loaded from config.json plus the run's overrides, its own seed and its own
+log file. A summary table is printed and saved next to the logs.
+"""
+import argparse
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+def parse_value(text):
+    """Parse an override value as JSON, falling back to a plain string."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+def parse_grid(specs):
+    """Expand "section.key=v1,v2,..." specs into the list of their combinations."""
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"Grid spec {spec!r} must look like 'section.key=v1,v2'")
+        axes.append([(name, parse_value(value)) for value in values.split(",")])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+def run_one(run_id, overrides, seed, frames, log_name):
+    """Run one headless simulation in this worker process and return its summary row."""
+    # Imported here so every worker builds its own config from scratch
+    from Config import config
+    import simulation
+
+    run_overrides = dict(overrides)
+    run_overrides["simulation.enable_display"] = False
+    run_overrides["simulation.max_frames"] = frames
+    settings = config.reload(run_overrides)
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        summary = simulation.run_simulation(seed=seed, log_name=log_name, settings=settings)
+    summary["seconds"] = time.perf_counter() - start
+    return {"run": run_id, "seed": seed, "overrides": overrides, **summary}
+
+def run_sweep(runs, frames, workers=None, base_seed=0):
+    """Run every override dict in runs in a process pool and return the summary rows in run order."""
+    from Config import config
+    # Build every run's settings once here, so an unknown or invalid override fails before any run starts
+    for overrides in runs:
+        config.reload(overrides)
+
+    stamp = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(run_one, run_id, overrides, base_seed + run_id, frames, f"sweep-{stamp}-{run_id:03d}")
+            for run_id, overrides in enumerate(runs)
+        ]
+        for future in as_completed(futures):
+            row = future.result()
+            print(f"Run {row['run']} done in {row['seconds']:.1f}s: {row['overrides']}")
+            rows.append(row)
+    return sorted(rows, key=lambda row: row["run"])
+
+def format_table(rows):
+    """Return the summary rows as a fixed-width text table."""
+    keys = sorted({name for row in rows for name in row["overrides"]})
+    headers = ["run", "seed"] + keys + ["frames", "seconds", "mean_speed", "color_spread", "log"]
+    table = [
+        [str(row["run"]), str(row["seed"])]
+        + [str(row["overrides"].get(name, "")) for name in keys]
+        + [str(row["frames"]), f"{row['seconds']:.2f}", f"{row['mean_speed']:.3f}",
+           f"{row['color_spread']:.2f}", row["log_filename"]]
+        for row in rows
+    ]
+    widths = [max(len(cell) for cell in column) for column in zip(headers, *table)]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(line, widths)) for line in [headers] + table]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over headless simulations")
+    parser.add_argument("--grid", action="append", default=[], metavar="SECTION.KEY=V1,V2",
+                        help="Override values to combine (repeat for more axes)")
+    parser.add_argument("--runs", metavar="FILE",
+                        help="JSON file holding a list of override dicts, used instead of --grid")
+    parser.add_argument("--frames", type=int, default=1000, help="Frames per run")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first run; run i uses seed + i")
+    args = parser.parse_args()
+
+    if args.runs:
+        with open(args.runs) as f:
+            runs = json.load(f)
+    else:
+        runs = parse_grid(args.grid) if args.grid else [{}]
+
+    start = time.perf_counter()
+    rows = run_sweep(runs, args.frames, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print()
+    print(format_table(rows))
+    print(f"\n{len(rows)} runs in {elapsed:.1f}s")
+
+    os.makedirs("logs", exist_ok=True)
+    summary_file = os.path.join("logs", f"sweep-{datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.json")
+    with open(summary_file, "w") as f:
+        json.dump({"frames": args.frames, "seconds": elapsed, "runs": rows}, f, indent=2)
+    print(f"Summary saved to {summary_file}")
+
+if __name__ == "__main__":
+    main()
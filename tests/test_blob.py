@@ -0,0 +1,121 @@
+import tracemalloc
+import pytest
+from Blob import Arena, Blob
+from CollisionMemory import CollisionMemory
+from Config import config
+from Population import Population
+
+# Baseline blobs (instance dict, color list, per-blob collision dict) took about 410 bytes
+MAX_BYTES_PER_BLOB = 300
+
+def bytes_per_blob(make_blobs, count=20000):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        blobs = make_blobs(count)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(blobs) == count
+    return (after - before) / count
+
+def test_memory_per_blob_in_population():
+    settings = config.snapshot()
+    size = bytes_per_blob(lambda count: Population(count, 15, 4000, 4000, seed=1, settings=settings).blobs)
+    assert size < MAX_BYTES_PER_BLOB
+
+def test_memory_per_standalone_blob():
+    Blob(15, 800, 600)  # the first blob builds the shared Arena
+    size = bytes_per_blob(lambda count: [Blob(15, 800, 600) for _ in range(count)])
+    assert size < MAX_BYTES_PER_BLOB
+
+def test_standalone_blobs_share_an_arena():
+    a, b = Blob(15, 800, 600), Blob(15, 800, 600)
+    assert a.arena is b.arena is Arena.standalone(800, 600)
+    assert Blob(15, 640, 480).arena is not a.arena
+    assert a.index != b.index
+    assert (a.window_width, a.window_height) == (800, 600)
+
+def test_clear_standalone_starts_a_fresh_arena():
+    a, b = Blob(15, 800, 600), Blob(15, 800, 600)
+    a.collision_memory.bump(a.index, b.index)
+    Arena.clear_standalone()
+    c = Blob(15, 800, 600)
+    assert c.arena is not a.arena and len(c.collision_memory) == 0
+    assert a.collision_memory.get(a.index, b.index) == 1.0
+
+def test_attributes_and_move():
+    blob = Blob(10, 800, 600, x=795.0, y=5.0, vx=1.0, vy=-1.0, color=[120, 130, 140])
+    assert (blob.x, blob.y, blob.vx, blob.vy) == (795.0, 5.0, 1.0, -1.0)
+    blob.vx = 9.0
+    blob.move()
+    # Damped above MAX_SPEED, then wrapped around both edges
+    damping = blob.settings.SPEED_DAMPING
+    assert blob.vx == pytest.approx(9.0 * damping)
+    assert blob.x == pytest.approx((795.0 + 9.0 * damping) % 800)
+    assert blob.y == pytest.approx((5.0 - damping) % 600)
+
+def test_color_is_a_mutable_view():
+    blob = Blob(10, 800, 600, color=[120, 130, 140])
+    assert blob.color == [120, 130, 140] and blob.color == (120, 130, 140)
+    assert list(blob.color) == [120, 130, 140] and len(blob.color) == 3
+    blob.color[1] = 180
+    assert blob.color[1] == 180 and blob.rgb == (120, 180, 140)
+    blob.color = (1, 2, 3)
+    assert blob.color[-1] == 3 and blob.color[:2] == (1, 2)
+
+@pytest.mark.parametrize("channel, value", [(1, 300), (0, -1), (2, 256)])
+def test_color_channels_out_of_range_raise(channel, value):
+    blob = Blob(10, 800, 600, color=[120, 130, 140])
+    with pytest.raises(ValueError, match="0..255"):
+        blob.color[channel] = value
+    color = [120, 130, 140]
+    color[channel] = value
+    with pytest.raises(ValueError, match="0..255"):
+        blob.color = color
+    assert blob.rgb == (120, 130, 140)
+
+def test_bounce_off_and_memory_decay_on_move():
+    a = Blob(15, 800, 600, x=100.0, y=100.0, vx=0.3, vy=0.0, color=[100, 100, 100])
+    b = Blob(15, 800, 600, x=110.0, y=100.0, vx=-0.3, vy=0.0, color=[200, 200, 200])
+    assert a.collides_with(b)
+    a.bounce_off(b)
+    assert a.vx < 0 < b.vx
+    assert a.collision_memory.get(a.index, b.index) == 1.0
+    a.bounce_off(b)
+    assert a.collision_memory.get(a.index, b.index) == 2.0
+
+    # Standalone blobs fade their pairs as they move, once per frame of moves
+    for _ in range(2):
+        a.move()
+        b.move()
+    decay = a.settings.COLLISION_MEMORY_DECAY
+    assert a.collision_memory.get(a.index, b.index) == pytest.approx(2.0 * decay ** 2)
+    for _ in range(100):
+        a.move()
+        b.move()
+    assert a.collision_memory.get(a.index, b.index) == 0.0
+
+def test_population_decays_once_per_frame():
+    population = Population(2, 15, 800, 600, seed=1, settings=config.snapshot())
+    a, b = population.blobs
+    population.collision_memory.bump(a.index, b.index)
+    a.move()
+    b.move()
+    # The population's arena leaves decay to Population.move
+    assert population.collision_memory.get(a.index, b.index) == 1.0
+    population.move()
+    assert population.collision_memory.get(a.index, b.index) == pytest.approx(population.settings.COLLISION_MEMORY_DECAY)
+
+def test_memory_decays_one_blob_by_its_own_pairs():
+    memory = CollisionMemory(capacity=4, decay=0.5)
+    for i, j in ((0, 1), (0, 2), (1, 2), (3, 0)):
+        memory.bump(i, j)
+    memory.decay(0)
+    assert [memory.get(0, 1), memory.get(0, 2), memory.get(0, 3), memory.get(1, 2)] == [0.5, 0.5, 0.5, 1.0]
+    for _ in range(3):
+        memory.decay(0)
+    # Faded below FORGET_BELOW and evicted; blob 1's pair is untouched
+    assert len(memory) == 1 and memory.slots_by_lower == {1: {memory.slots[(1, 2)]}}
+    memory.forget(1, 2)
+    assert memory.slots_by_lower == {}
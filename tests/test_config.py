@@ -0,0 +1,35 @@
+import pytest
+from Config import config
+
+def test_reload_leaves_the_config_alone():
+    before = config.snapshot().values()
+    settings = config.reload({"simulation.num_blobs": 7, "physics.max_speed": 3.5})
+    assert (settings.NUM_BLOBS, settings.MAX_SPEED) == (7, 3.5)
+    assert config.snapshot().values() == before
+
+@pytest.mark.parametrize("changes, message", [
+    ({"FPS": "60"}, "FPS must be a number"),
+    ({"MINIMUM_COLOR": None}, "MINIMUM_COLOR must be a number"),
+    ({"SPEED_DAMPING": True}, "SPEED_DAMPING must be a number"),
+    ({"LOG_QUEUE_SIZE": 0}, "LOG_QUEUE_SIZE must be positive"),
+    ({"MAX_CATCHUP_TICKS": -1}, "MAX_CATCHUP_TICKS must be positive"),
+    ({"SPRITE_CACHE_SIZE": 0}, "SPRITE_CACHE_SIZE must be positive"),
+    ({"EXPORT_MEMORY_BUDGET_MB": 0}, "EXPORT_MEMORY_BUDGET_MB must be positive"),
+    ({"EXPORT_PNG_COMPRESSION": 10}, "EXPORT_PNG_COMPRESSION must be a zlib level"),
+])
+def test_invalid_values_raise_value_error(changes, message):
+    with pytest.raises(ValueError, match=message):
+        config.snapshot().replace(**changes)
+
+@pytest.mark.parametrize("overrides", [
+    {"physics.max_sped": 9.0},
+    {"behaviour.flock_color_threshold": 10},
+])
+def test_reload_rejects_unknown_overrides(overrides):
+    with pytest.raises(ValueError, match=f"Unknown config override {next(iter(overrides))!r}"):
+        config.reload(overrides)
+
+def test_sweep_rejects_unknown_overrides_before_running():
+    import sweep
+    with pytest.raises(ValueError, match="physics.max_sped"):
+        sweep.run_sweep([{"physics.max_speed": 3.0}, {"physics.max_sped": 9.0}], frames=1, workers=1)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from Config import config
+from ParallelWorld import ParallelWorld
+from World import World
+
+@pytest.mark.parametrize("num_blobs, radius, width, height", [
+    (600, 8, 900, 500),     # several strips
+    (300, 15, 80, 700),     # two columns: a single tile, neighbours wrap onto the same cell
+    (60, 10, 30, 2000),     # one column
+])
+def test_steps_like_world(num_blobs, radius, width, height):
+    settings = config.snapshot().replace(NUM_BLOBS=num_blobs, TARGET_SEARCH_CHANCE=0.2)
+    world = World(num_blobs, radius, width, height, seed=21, settings=settings)
+    parallel = ParallelWorld(num_blobs, radius, width, height, seed=21, workers=3, settings=settings)
+    rng = np.random.default_rng(22)
+    # Crowd the wrap seams, which are strip borders too, so pairs straddle them
+    seam_x = rng.uniform(-radius, radius, num_blobs // 4) % width
+    seam_y = rng.uniform(-radius, radius, num_blobs // 4) % height
+    for each in (world, parallel):
+        each.x[: num_blobs // 4], each.y[: num_blobs // 4] = seam_x, seam_y
+    try:
+        for _ in range(15):
+            world.step()
+            parallel.step()
+            for expected, actual in zip(world.columns(), parallel.columns()):
+                np.testing.assert_array_equal(actual, expected)
+            np.testing.assert_array_equal(parallel.memory_keys, world.memory_keys)
+            np.testing.assert_array_equal(parallel.memory_values, world.memory_values)
+        assert len(world.memory_keys) > 0
+    finally:
+        parallel.close()
+
+def test_empty_world_steps():
+    parallel = ParallelWorld(0, 10, 300, 300, seed=1, workers=2, settings=config.snapshot().replace(NUM_BLOBS=0))
+    try:
+        parallel.step()
+        assert len(parallel) == 0
+    finally:
+        parallel.close()
@@ -0,0 +1,15 @@
+import time
+from Scheduler import Scheduler
+
+def test_locked_scheduler_counts_ticks_up_to_the_limit():
+    scheduler = Scheduler()
+    ran = sum(scheduler.ticks_due(limit) for limit in (3, 1, 0, float("inf")))
+    assert ran == scheduler.ticks == 3
+
+def test_catch_up_counts_only_the_ticks_granted():
+    scheduler = Scheduler(tick_rate=1000, max_catchup_ticks=50)
+    time.sleep(0.02)
+    assert scheduler.ticks_due(2) == 2
+    assert scheduler.stats()["ticks"] == 2
+    # The ticks withheld by the limit are still owed
+    assert scheduler.ticks_due() > 10
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from Config import config
+from SpatialHash import SpatialHash
+from World import World
+
+def brute_force_contacts(x, y, radius, width, height):
+    """Touching pairs (i, j), i < j, from the nested all-pairs loop."""
+    i, j = np.triu_indices(len(x), k=1)
+    dx = x[i] - x[j]
+    dy = y[i] - y[j]
+    dx -= width * np.round(dx / width)
+    dy -= height * np.round(dy / height)
+    touching = np.hypot(dx, dy) < radius[i] + radius[j]
+    return i[touching], j[touching]
+
+@pytest.mark.parametrize("num_blobs, radius, width, height", [
+    (400, 10, 500, 400),    # many cells
+    (300, 15, 80, 700),     # two columns: neighbours wrap onto the same cell
+    (200, 15, 40, 40),      # a single cell
+    (500, 2.5, 1000, 30),   # one row
+    (50, 0, 300, 300),      # zero radius: nothing touches
+])
+def test_contacts_match_brute_force(num_blobs, radius, width, height):
+    world = World(num_blobs, radius, width, height, seed=11, settings=config.snapshot())
+    rng = np.random.default_rng(12)
+    # Crowd the seams so pairs straddle them
+    world.x[: num_blobs // 4] = rng.uniform(-radius, radius, num_blobs // 4) % width
+    world.y[: num_blobs // 4] = rng.uniform(-radius, radius, num_blobs // 4) % height
+    i, j = world.find_contacts()
+    expected_i, expected_j = brute_force_contacts(world.x, world.y, world.radius, width, height)
+    np.testing.assert_array_equal(i, expected_i)
+    np.testing.assert_array_equal(j, expected_j)
+
+def test_candidate_pairs_are_sorted_and_unique():
+    rng = np.random.default_rng(3)
+    x, y = rng.uniform(0, 90, 300), rng.uniform(0, 500, 300)
+    i, j = SpatialHash(30, 90, 500).candidate_pairs(x, y)
+    keys = i * 300 + j
+    assert (i < j).all()
+    assert (np.diff(keys) > 0).all()
+
+def test_empty_world_steps():
+    world = World(0, 15, 800, 600, seed=1, settings=config.snapshot().replace(NUM_BLOBS=0))
+    world.step()
+    i, j = world.find_contacts()
+    assert i.size == j.size == 0
+
+def test_cell_size_has_a_floor():
+    grid = SpatialHash(0, 800, 600)
+    assert (grid.cols, grid.rows) == (800, 600)
+    assert grid.candidate_pairs(np.zeros(0), np.zeros(0))[0].size == 0
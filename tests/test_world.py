@@ -0,0 +1,80 @@
+import collections
+import numpy as np
+from Blob import Blob
+from Config import config
+from Population import Population
+from World import World
+
+def test_steps_like_blob_population(monkeypatch):
+    # Search and color mixing draw from different random streams, so leave them out;
+    # the rest agrees up to hypot rounding, which bounces amplify a little every frame
+    settings = config.snapshot().replace(TARGET_SEARCH_CHANCE=0, NUM_BLOBS=150)
+    population = Population(150, 15, 1200, 800, seed=7, settings=settings)
+    world = World(150, 15, 1200, 800, seed=7, settings=settings)
+    monkeypatch.setattr(Blob, "color_bounce", lambda *args: None)
+    monkeypatch.setattr("World.color_bounce", lambda *args: None)
+    for _ in range(20):
+        population.step()
+        world.step()
+    for expected, actual in zip(population.columns(), world.columns()):
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-6)
+
+    pairs, values = population.collision_memory.live_entries()
+    keys = pairs[:, 0] * len(world) + pairs[:, 1]
+    order = np.argsort(keys)
+    np.testing.assert_array_equal(world.memory_keys, keys[order])
+    np.testing.assert_allclose(world.memory_values, values[order])
+
+def test_flocks_like_blob_population(monkeypatch):
+    settings = config.snapshot().replace(TARGET_SEARCH_CHANCE=0, NUM_BLOBS=150, FLOCKS="track",
+                                         FLOCK_COLOR_THRESHOLD=80)
+    population = Population(150, 15, 1200, 800, seed=8, settings=settings)
+    world = World(150, 15, 1200, 800, seed=8, settings=settings)
+    monkeypatch.setattr(Blob, "color_bounce", lambda *args: None)
+    monkeypatch.setattr("World.color_bounce", lambda *args: None)
+    flocks = 0
+    for _ in range(10):
+        population.step()
+        world.step()
+        np.testing.assert_array_equal(population.flocks.labels, world.flocks.labels)
+        flocks += population.flocks.count
+    assert flocks > 0
+
+def test_search_picks_uniform_matches():
+    settings = config.snapshot().replace(FLOCK_COLOR_THRESHOLD=20)
+    world = World(300, 5, 500, 500, seed=3, settings=settings)
+    searchers = np.array([0, 5, 17])
+    hits = collections.Counter()
+    for _ in range(3000):
+        rows, targets = world._pick_targets(searchers)
+        hits.update(zip(rows.tolist(), targets.tolist()))
+
+    for searcher in searchers.tolist():
+        diff = world.color - world.color[searcher]
+        matches = set(np.flatnonzero((diff * diff).sum(axis=1) < 400).tolist()) - {searcher}
+        counts = [hits[searcher, target] for target in matches]
+        assert {target for row, target in hits if row == searcher} == matches
+        # Each match is expected 3000 / len(matches) times
+        assert min(counts) > 0.7 * 3000 / len(matches)
+        assert max(counts) < 1.3 * 3000 / len(matches)
+
+def test_search_scans_sparse_neighbourhoods():
+    settings = config.snapshot().replace(FLOCK_COLOR_THRESHOLD=3, MINIMUM_COLOR=0, MAXIMUM_COLOR=255)
+    world = World(3000, 5, 500, 500, seed=4, settings=settings)
+    rows, targets = world._pick_targets(np.arange(3000))
+
+    diff = world.color[rows] - world.color[targets]
+    assert ((diff * diff).sum(axis=1) < 9).all() and (rows != targets).all()
+    distance_sq = ((world.color[:, None, :] - world.color[None, :, :]) ** 2).sum(axis=2)
+    np.fill_diagonal(distance_sq, 9)
+    np.testing.assert_array_equal(rows, np.flatnonzero((distance_sq < 9).any(axis=1)))
+
+def test_search_kicks_towards_target():
+    settings = config.snapshot().replace(TARGET_SEARCH_CHANCE=2, VELOCITY_KICK_STRENGTH=0.5)
+    world = World(200, 5, 600, 400, seed=5, settings=settings)
+    vx, vy = world.vx.copy(), world.vy.copy()
+    world.search_for_targets()
+    kick = np.hypot(world.vx - vx, world.vy - vy)
+    kicked = kick > 0
+    assert kicked.sum() > 150
+    np.testing.assert_allclose(kick[kicked], 0.5)
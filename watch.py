@@ -0,0 +1,62 @@
+"""Watch a simulation streamed by a stream server, drawn with Display.
+
+Example:
+    python simulation.py --serve --port 8765       # on the simulation host
+    python watch.py --host 127.0.0.1 --port 8765   # anywhere with pygame
+
+The window is a camera view of the streamed world (display.window_width x
+display.window_height, or the world size), with the usual pan and zoom
+controls. Only the watcher needs pygame.
+"""
+import argparse
+import asyncio
+import json
+from Config import config
+from StreamServer import StreamState, read_message
+
+async def watch(host, port, max_fps):
+    """Connect to a stream server and draw its frames until the window closes or the server goes away."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps({"max_fps": max_fps}).encode() + b"\n")
+    await writer.drain()
+
+    # The server's first message carries the world size
+    state = StreamState()
+    state.apply(*await read_message(reader))
+
+    from Display import Display
+    settings = config.snapshot()
+    display = Display(settings.WINDOW_WIDTH or state.width, settings.WINDOW_HEIGHT or state.height,
+                      state.width, state.height, settings)
+
+    async def receive():
+        while True:
+            state.apply(*await read_message(reader))
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while not receiver.done() and display.handle_events():
+            if state.ready:
+                display.clear()
+                display.draw_blobs(state.x, state.y, state.radius, state.color)
+                display.update(limit_fps=False)
+            await asyncio.sleep(1 / max_fps)
+    finally:
+        receiver.cancel()
+        writer.close()
+        display.close()
+    if receiver.done() and not receiver.cancelled() and receiver.exception() is not None:
+        print(f"Connection closed: {receiver.exception()!r}")
+    print(f"Last frame received: {state.frame}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a streamed simulation")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--fps", type=float, default=config.SERVER_MAX_CLIENT_FPS,
+                        help="Frames per second to ask the server for")
+    args = parser.parse_args()
+    asyncio.run(watch(args.host, args.port, args.fps))
+
+if __name__ == "__main__":
+    main()